@@ -1,60 +1,239 @@
+import asyncio
 import json
 import hashlib
 import os
 import re
+import sqlite3
+import sys
+import threading
+import time
+import uuid
 from datetime import datetime
+from cache import LRUCache
+from scheduler import PRIORITY_NORMALIZATION, get_scheduler
+from similarity import ClaimIndex
 
+# Legacy whole-file archive; only read when seeding or migrating the database
 ARCHIVE_FILE = "analysis_archive.json"
+ARCHIVE_DB = os.getenv("CRISISSAFE_ARCHIVE_DB", "analysis_archive.db")
+ARCHIVE_BUSY_TIMEOUT_MS = 5000
+# In-progress verification locks and background jobs live in their own
+# file, so taking locks and updating jobs never touches the archive database
+CLAIM_LOCK_DB = os.getenv("CRISISSAFE_LOCK_DB", os.path.splitext(ARCHIVE_DB)[0] + ".locks.db")
 
-# Cache for normalized claims to avoid repeated AI calls
-_normalization_cache = {}
+# In-process cache of recently read archive entries
+ARCHIVE_CACHE_SIZE = int(os.getenv("CRISISSAFE_ARCHIVE_CACHE_SIZE", "1024"))
+ARCHIVE_CACHE_TTL = float(os.getenv("CRISISSAFE_ARCHIVE_CACHE_TTL", "300"))
 
-def normalize_claim_semantically(text, client=None):
+# One SQLite connection per thread per database path
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = set()
+
+_archive_cache = LRUCache(ARCHIVE_CACHE_SIZE, ARCHIVE_CACHE_TTL)
+_archive_cache_generation = None
+_archive_cache_lock = threading.Lock()
+
+# Near-duplicate lookup: cosine similarity over hashed n-gram vectors of
+# normalized claims, gated by similarity.ClaimTerms. Set the threshold above
+# 1 to disable. On the shipped archive, rewordings of one claim score 0.8 and
+# up, while the closest different claim that agrees on its terms ("Is the
+# COVID-19 virus contagious?" / "COVID-19 is a virus.") scores 0.79.
+SIMILARITY_THRESHOLD = float(os.getenv("CRISISSAFE_SIMILARITY_THRESHOLD", "0.8"))
+
+_claim_index = ClaimIndex()
+_claim_index_rowid = 0
+_claim_index_lock = threading.Lock()
+
+# Cache for normalized claims to avoid repeated AI calls.
+# Bounded in memory; AI results are also persisted to the archive database
+# so they survive restarts and are shared between worker processes.
+NORMALIZATION_CACHE_SIZE = int(os.getenv("CRISISSAFE_NORMALIZATION_CACHE_SIZE", "4096"))
+PERSIST_NORMALIZATIONS = os.getenv("CRISISSAFE_PERSIST_NORMALIZATIONS", "1") != "0"
+# Most persisted normalizations kept; the oldest are pruned past this
+NORMALIZATION_DB_SIZE = int(os.getenv("CRISISSAFE_NORMALIZATION_DB_SIZE", "100000"))
+# Including time spent queued for the rate limit; basic normalization is used after that
+NORMALIZATION_TIMEOUT = 15
+
+_normalization_cache = LRUCache(NORMALIZATION_CACHE_SIZE)
+# Claims whose AI normalization failed or timed out, mapped to their basic form
+_fallback_cache = LRUCache(NORMALIZATION_CACHE_SIZE)
+_normalization_counters = {"disk_hits": 0, "llm_calls": 0}
+_normalization_counters_lock = threading.Lock()
+
+def _count_normalization(counter):
+    with _normalization_counters_lock:
+        _normalization_counters[counter] += 1
+
+def _read_persisted_normalization(cache_key):
+    """Look up an AI normalization stored by any process, or None."""
+    try:
+        row = get_connection().execute(
+            "SELECT normalized FROM normalizations WHERE cache_key = ?", (cache_key,)
+        ).fetchone()
+    except Exception as e:
+        print(f"Error reading normalization cache: {e}")
+        return None
+    return row[0] if row else None
+
+def _persist_normalization(cache_key, normalized):
     """
-    Normalize a claim to a canonical form using AI.
-    This helps match semantically similar claims like:
-    "Is covid Contagious" and "Is the Virus Covid-19 Contagious"
+    Store an AI normalization so other processes and restarts can reuse it.
+    Only the newest NORMALIZATION_DB_SIZE rows are kept.
     """
-    # Check cache first
-    cache_key = text.lower().strip()
-    if cache_key in _normalization_cache:
-        return _normalization_cache[cache_key]
+    try:
+        conn = get_connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO normalizations (cache_key, normalized, timestamp) VALUES (?, ?, ?)",
+                (cache_key, normalized, datetime.now().isoformat())
+            )
+            # INSERT OR REPLACE gives the row a fresh rowid, so rowid order is write order
+            conn.execute(
+                "DELETE FROM normalizations WHERE rowid <= (SELECT MAX(rowid) FROM normalizations) - ?",
+                (NORMALIZATION_DB_SIZE,)
+            )
+    except Exception as e:
+        print(f"Error saving normalization cache: {e}")
+
+def get_normalization_cache_stats():
+    """
+    Counters for the normalization cache.
+    llm_calls is the number of round-trips actually made; hits and
+    disk_hits are round-trips saved.
+    """
+    stats = _normalization_cache.stats()
+    with _normalization_counters_lock:
+        stats.update(_normalization_counters)
+    return stats
+
+def _lookup_normalization(cache_key):
+    """Normalization already computed by this or another process, or None."""
+    normalized = _normalization_cache.get(cache_key)
+    if normalized is not None:
+        return normalized
     
+    if PERSIST_NORMALIZATIONS:
+        normalized = _read_persisted_normalization(cache_key)
+        if normalized is not None:
+            _count_normalization("disk_hits")
+            _normalization_cache.set(cache_key, normalized)
+            return normalized
+    return None
+
+def _normalizer_messages(text):
+    return [
+        {
+            "role": "system",
+            "content": "You are a text normalizer. Convert the given claim/question to a canonical, standardized form. Remove filler words, normalize terminology (e.g., 'covid', 'covid-19', 'coronavirus' → 'COVID-19'), and standardize phrasing. Return ONLY the normalized text, nothing else."
+        },
+        {
+            "role": "user",
+            "content": f"Normalize this claim to canonical form:\n{text[:500]}"
+        }
+    ]
+
+def _accept_normalization(text, cache_key, normalized):
+    """
+    Validate an AI normalization, then cache and persist it.
+    Returns (normalized, fell_back) like _normalize.
+    """
+    # Fallback to basic normalization if AI returns something weird
+    if len(normalized) < 3 or len(normalized) > 500:
+        return _fallback_normalization(text, cache_key), True
+    if PERSIST_NORMALIZATIONS:
+        _persist_normalization(cache_key, normalized)
+    
+    _normalization_cache.set(cache_key, normalized)
+    return normalized, False
+
+def _fallback_normalization(text, cache_key):
+    # Kept in memory only so a later successful AI call can still replace it,
+    # and apart from the AI results so callers can tell the two apart
+    normalized = basic_normalize(text)
+    _fallback_cache.set(cache_key, normalized)
+    return normalized
+
+def _cached_normalization(text, client):
+    """
+    (normalized, fell_back) when no AI call is needed, else None.
+    A claim whose AI normalization failed recently keeps its basic form
+    rather than waiting on the AI again.
+    """
+    cache_key = text.lower().strip()
+    normalized = _lookup_normalization(cache_key)
+    if normalized is not None:
+        return normalized, False
     # If no client provided, do basic normalization
     if client is None:
-        normalized = basic_normalize(text)
-        _normalization_cache[cache_key] = normalized
-        return normalized
+        return basic_normalize(text), False
+    normalized = _fallback_cache.get(cache_key)
+    if normalized is not None:
+        return normalized, True
+    return None
+
+def _normalize(text, client=None):
+    """
+    normalize_claim_semantically, returning (normalized, fell_back).
+    fell_back is True when a client was given but the AI normalization
+    failed or timed out (e.g. queued behind the rate limit) and the basic
+    form stands in for it.
+    """
+    cached = _cached_normalization(text, client)
+    if cached is not None:
+        return cached
     
+    cache_key = text.lower().strip()
     try:
-        response = client.chat.completions.create(
+        _count_normalization("llm_calls")
+        response = get_scheduler().call(
+            "gpt-4o-mini", PRIORITY_NORMALIZATION, client.chat.completions.create,
             model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a text normalizer. Convert the given claim/question to a canonical, standardized form. Remove filler words, normalize terminology (e.g., 'covid', 'covid-19', 'coronavirus' → 'COVID-19'), and standardize phrasing. Return ONLY the normalized text, nothing else."
-                },
-                {
-                    "role": "user",
-                    "content": f"Normalize this claim to canonical form:\n{text[:500]}"
-                }
-            ],
+            messages=_normalizer_messages(text),
             max_tokens=100,
-            temperature=0.1  # Low temperature for consistency
+            temperature=0.1,  # Low temperature for consistency
+            timeout=NORMALIZATION_TIMEOUT,
+            deadline=time.monotonic() + NORMALIZATION_TIMEOUT
         )
-        
-        normalized = response.choices[0].message.content.strip()
-        # Fallback to basic normalization if AI returns something weird
-        if len(normalized) < 3 or len(normalized) > 500:
-            normalized = basic_normalize(text)
-        
-        _normalization_cache[cache_key] = normalized
-        return normalized
+        return _accept_normalization(text, cache_key, response.choices[0].message.content.strip())
     except Exception:
         # Fallback to basic normalization
-        normalized = basic_normalize(text)
-        _normalization_cache[cache_key] = normalized
-        return normalized
+        return _fallback_normalization(text, cache_key), True
+
+def normalize_claim_semantically(text, client=None):
+    """
+    Normalize a claim to a canonical form using AI.
+    This helps match semantically similar claims like:
+    "Is covid Contagious" and "Is the Virus Covid-19 Contagious"
+    """
+    return _normalize(text, client)[0]
+
+async def _normalize_async(text, client=None):
+    """_normalize for an AsyncOpenAI client; shares the same caches."""
+    # A memory miss falls through to SQLite, which must not block the event loop
+    cached = await asyncio.to_thread(_cached_normalization, text, client)
+    if cached is not None:
+        return cached
+    
+    cache_key = text.lower().strip()
+    try:
+        _count_normalization("llm_calls")
+        response = await get_scheduler().call_async(
+            "gpt-4o-mini", PRIORITY_NORMALIZATION, client.chat.completions.create,
+            model="gpt-4o-mini",
+            messages=_normalizer_messages(text),
+            max_tokens=100,
+            temperature=0.1,
+            timeout=NORMALIZATION_TIMEOUT,
+            deadline=time.monotonic() + NORMALIZATION_TIMEOUT
+        )
+        return _accept_normalization(text, cache_key, response.choices[0].message.content.strip())
+    except Exception:
+        return _fallback_normalization(text, cache_key), True
+
+async def normalize_claim_semantically_async(text, client=None):
+    """normalize_claim_semantically for an AsyncOpenAI client; shares the same caches."""
+    return (await _normalize_async(text, client))[0]
 
 def basic_normalize(text):
     """
@@ -74,64 +253,699 @@ def basic_normalize(text):
     
     return text.strip()
 
+# ---------- Local canonicalizer ----------
+# Entity aliases folded into a single token before the local key is built
+_ENTITY_ALIASES = [
+    (r'covid[\s-]*19|covid|corona\s*virus|novel coronavirus|sars[\s-]*cov[\s-]*2', 'covid19'),
+    (r'united states of america|united states|u\.s\.a\.?|u\.s\.|usa|america', 'usa'),
+    (r'united kingdom|great britain|britain|u\.k\.', 'uk'),
+    (r'world health organi[sz]ation', 'worldhealthorg'),
+    (r'artificial intelligence|a\.i\.', 'ai'),
+    (r'vaccines?|vaccinations?|vaccinated|jabs?', 'vaccine'),
+    (r'5\s+g', '5g'),
+]
+_ENTITY_RE = re.compile(
+    r'\b(?:' + '|'.join(f'(?P<alias{i}>{pattern})' for i, (pattern, _) in enumerate(_ENTITY_ALIASES)) + r')(?!\w)'
+)
+_ENTITY_TOKENS = {f'alias{i}': token for i, (_, token) in enumerate(_ENTITY_ALIASES)}
+
+# Filler words dropped from the local key. Negations are deliberately kept,
+# and so are past-tense auxiliaries: "the bridge was closed" is not a claim
+# that it is closed now.
+_LOCAL_STOPWORDS = frozenset({
+    "the", "a", "an", "is", "are", "be", "being", "am",
+    "do", "does", "has", "have", "it", "its", "this", "that",
+    "these", "those", "of", "in", "on", "at", "by", "for", "with", "and",
+    "as", "so", "just", "really", "actually", "please", "very", "truly",
+    "claim", "true", "whether",
+})
+_LOCAL_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_LOCAL_SYNONYMS = {"were": "was"}
+
+def _stem(word):
+    """Tiny suffix stripper; only needs to be consistent, not linguistic."""
+    if len(word) <= 3 or word.isdigit():
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    # "-ed" is kept: "closed" and "close" differ in tense, not just form
+    if word.endswith("ing") and len(word) >= 6:
+        return word[:-3]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+def local_normalize(text):
+    """
+    Deterministic canonical form of a claim, computed without any network call.
+    Folds entity aliases, drops filler words and stems tokens, so
+    "Is the Coronavirus contagious?" and "covid-19 contagious" share a key,
+    while "is" and "was" claims do not.
+    Token order is kept: "Dog bites man" and "Man bites dog" are different
+    claims, and this key is trusted without any AI check.
+    """
+    text = _ENTITY_RE.sub(lambda m: f" {_ENTITY_TOKENS[m.lastgroup]} ", text.lower().replace("'", ""))
+    tokens = [_stem(_LOCAL_SYNONYMS.get(t, t)) for t in _LOCAL_TOKEN_RE.findall(text) if t not in _LOCAL_STOPWORDS]
+    return " ".join(tokens)
+
+def get_local_hash(text):
+    """Hash of the local canonical form; a separate keyspace from claim hashes."""
+    return hashlib.sha256(("local:" + local_normalize(text)).encode()).hexdigest()
+
+def get_exact_hash(text):
+    """
+    Hash of the claim text itself, ignoring only case and whitespace.
+    Keys work in flight (coalescing, locks, jobs), where two wordings must
+    never be mistaken for one claim.
+    """
+    return hashlib.sha256(("exact:" + " ".join(text.lower().split())).encode()).hexdigest()
+
+class ClaimKey:
+    """
+    Original text, normalized form and archive hash of one claim.
+    Normalization runs at most once per key, so a key passed through both
+    lookup and store costs a single (possibly AI) normalization.
+    The local form and hash are computed up front; the AI-normalized form
+    is only computed when first accessed.
+    """
+
+    def __init__(self, text, client=None):
+        self.text = text
+        self.client = client
+        self.local_normalized = local_normalize(text)
+        self.local_hash = hashlib.sha256(("local:" + self.local_normalized).encode()).hexdigest()
+        self._normalized = None
+        self._fell_back = False
+        self._lock = threading.Lock()
+
+    @property
+    def normalized(self):
+        if self._normalized is None:
+            with self._lock:
+                if self._normalized is None:
+                    self._normalized, self._fell_back = _normalize(self.text, self.client)
+        return self._normalized
+
+    @property
+    def fell_back(self):
+        """Whether the AI normalization failed and the basic form stands in for it."""
+        return self.normalized is not None and self._fell_back
+
+    async def normalize_async(self, client):
+        """Compute the normalized form with an AsyncOpenAI client, if not done yet."""
+        if self._normalized is None:
+            normalized, fell_back = await _normalize_async(self.text, client)
+            with self._lock:
+                if self._normalized is None:
+                    self._normalized, self._fell_back = normalized, fell_back
+        return self._normalized
+
+    @property
+    def hash(self):
+        return hashlib.sha256(self.normalized.encode()).hexdigest()
+
+def get_claim_key(text, client=None):
+    """Create the claim key to pass through get_cached_analysis and store_analysis."""
+    return ClaimKey(text, client)
+
 def get_claim_hash(text, client=None):
     """
     Create a hash of the semantically normalized claim text.
     Uses AI to normalize similar claims to the same canonical form.
     """
-    normalized = normalize_claim_semantically(text, client)
-    return hashlib.sha256(normalized.encode()).hexdigest()
+    return ClaimKey(text, client).hash
 
-def load_archive():
-    """Load the archive from JSON file."""
-    if os.path.exists(ARCHIVE_FILE):
+def _open_connection(db_path):
+    """Open a SQLite connection to the archive in WAL mode."""
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={ARCHIVE_BUSY_TIMEOUT_MS}")
+    return conn
+
+def _ensure_schema(conn, db_path):
+    """
+    Create the archive tables on first use.
+    A fresh ARCHIVE_DB is seeded from the legacy JSON archive exactly once;
+    other databases only get what migrate_json_archive imports into them.
+    PRAGMA user_version records which one-off upgrades have run.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            " claim_hash TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " normalized_claim TEXT,"
+            " timestamp TEXT"
+            ")"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS normalizations ("
+            " cache_key TEXT PRIMARY KEY,"
+            " normalized TEXT NOT NULL,"
+            " timestamp TEXT"
+            ")"
+        )
+        # Local canonical key -> archived claim hash
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS claim_aliases ("
+            " alias_hash TEXT PRIMARY KEY,"
+            " claim_hash TEXT NOT NULL"
+            ")"
+        )
+        # analyses_generation counts writes to analyses; read caches compare against it
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta ("
+            " key TEXT PRIMARY KEY,"
+            " value INTEGER NOT NULL"
+            ")"
+        )
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('analyses_generation', 0)")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1 and db_path == ARCHIVE_DB:
+            _import_json(conn, ARCHIVE_FILE)
+        if version < 4:
+            # Version 2 keys sorted their tokens, joining claims such as
+            # "India attacked Pakistan" and "Pakistan attacked India", and
+            # version 3 keys dropped tense ("is" / "was" closed)
+            conn.execute("DELETE FROM claim_aliases")
+            _backfill_aliases(conn)
+            conn.execute("PRAGMA user_version = 4")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+def _ensure_lock_schema(conn, db_path):
+    """Create the cross-process lock and verification job tables in CLAIM_LOCK_DB."""
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS claim_locks ("
+        " lock_key TEXT PRIMARY KEY,"
+        " owner TEXT NOT NULL,"
+        " expires_at REAL NOT NULL"
+        ")"
+    )
+    # Queued background verifications, shared by every process on the archive
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS verification_jobs ("
+        " job_id TEXT PRIMARY KEY,"
+        " claim TEXT NOT NULL,"
+        " lock_key TEXT NOT NULL,"
+        " status TEXT NOT NULL,"
+        " result TEXT,"
+        " error TEXT,"
+        " attempts INTEGER NOT NULL DEFAULT 0,"
+        " worker TEXT,"
+        " created_at REAL NOT NULL,"
+        " started_at REAL,"
+        " finished_at REAL"
+        ")"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS verification_jobs_status"
+        " ON verification_jobs (status, created_at)"
+    )
+    conn.commit()
+
+def get_connection(db_path=None):
+    """
+    Return this thread's connection to the archive database.
+    Each thread keeps its own connection; WAL mode lets readers run
+    concurrently with a single writer across threads and processes.
+    """
+    db_path = db_path or ARCHIVE_DB
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(db_path)
+    if conn is None:
+        conn = _open_connection(db_path)
+        with _schema_lock:
+            if db_path not in _schema_ready:
+                ensure = _ensure_lock_schema if db_path == CLAIM_LOCK_DB else _ensure_schema
+                ensure(conn, db_path)
+                _schema_ready.add(db_path)
+        connections[db_path] = conn
+    return conn
+
+def _import_json(conn, json_path, overwrite=False):
+    """Copy entries from a legacy JSON archive into an open connection."""
+    if not os.path.exists(json_path):
+        return 0
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            legacy = json.load(f)
+    except Exception as e:
+        print(f"Error reading legacy archive: {e}")
+        return 0
+
+    verb = "INSERT OR REPLACE" if overwrite else "INSERT OR IGNORE"
+    imported = 0
+    for claim_hash, entry in legacy.items():
+        cursor = conn.execute(
+            f"{verb} INTO analyses (claim_hash, data, normalized_claim, timestamp) VALUES (?, ?, ?, ?)",
+            (
+                claim_hash,
+                json.dumps(entry, ensure_ascii=False),
+                entry.get("normalized_claim"),
+                entry.get("timestamp"),
+            )
+        )
+        imported += cursor.rowcount
+    return imported
+
+def _backfill_aliases(conn):
+    """Derive local-key aliases for archived claims from their stored previews."""
+    rows = conn.execute(
+        "SELECT claim_hash, json_extract(data, '$.claim_preview') FROM analyses ORDER BY rowid"
+    ).fetchall()
+    for claim_hash, preview in rows:
+        if preview and len(preview) < 200:  # Truncated previews would alias the wrong text
+            conn.execute(
+                "INSERT OR REPLACE INTO claim_aliases (alias_hash, claim_hash) VALUES (?, ?)",
+                (get_local_hash(preview), claim_hash)
+            )
+
+def migrate_json_archive(json_path=None, db_path=None, overwrite=False):
+    """
+    One-shot migration of the legacy JSON archive into the SQLite store.
+    Existing database entries are kept unless overwrite is True.
+    Returns the number of entries written.
+    """
+    conn = get_connection(db_path)
+    with conn:
+        imported = _import_json(conn, json_path or ARCHIVE_FILE, overwrite)
+        _backfill_aliases(conn)
+        _bump_generation(conn)
+    return imported
+
+def read_entry(claim_hash, db_path=None):
+    """Fetch a single archived analysis by claim hash, or None."""
+    try:
+        row = get_connection(db_path).execute(
+            "SELECT data FROM analyses WHERE claim_hash = ?", (claim_hash,)
+        ).fetchone()
+    except Exception as e:
+        print(f"Error reading archive: {e}")
+        return None
+    return json.loads(row[0]) if row else None
+
+def _bump_generation(conn):
+    """Advance analyses_generation inside the caller's transaction; returns the new value."""
+    conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'analyses_generation'")
+    return conn.execute("SELECT value FROM meta WHERE key = 'analyses_generation'").fetchone()[0]
+
+def write_entry(claim_hash, entry, db_path=None):
+    """
+    Insert or replace a single archived analysis.
+    Returns the archive generation after the write, or None if it failed.
+    """
+    try:
+        conn = get_connection(db_path)
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO analyses (claim_hash, data, normalized_claim, timestamp) VALUES (?, ?, ?, ?)",
+                (
+                    claim_hash,
+                    json.dumps(entry, ensure_ascii=False),
+                    entry.get("normalized_claim"),
+                    entry.get("timestamp"),
+                )
+            )
+            return _bump_generation(conn)
+    except Exception as e:
+        print(f"Error saving archive: {e}")
+        return None
+
+def _archive_generation():
+    """
+    Change marker for archived analyses: a counter bumped by every write to
+    the analyses table, in any process. Writes to other tables (aliases,
+    normalizations, jobs) leave it alone.
+    """
+    try:
+        row = get_connection().execute(
+            "SELECT value FROM meta WHERE key = 'analyses_generation'"
+        ).fetchone()
+    except Exception:
+        return None
+    return row[0] if row else None
+
+def _sync_archive_cache():
+    """Drop cached entries if the archive changed since they were read."""
+    global _archive_cache_generation
+    generation = _archive_generation()
+    with _archive_cache_lock:
+        if generation != _archive_cache_generation:
+            _archive_cache.clear()
+            _archive_cache_generation = generation
+
+def read_entry_cached(claim_hash):
+    """
+    read_entry behind the in-process LRU cache.
+    Repeat lookups are served from memory until the entry expires or
+    another process writes to the archive.
+    """
+    _sync_archive_cache()
+    entry = _archive_cache.get(claim_hash)
+    if entry is None:
+        entry = read_entry(claim_hash)
+        if entry is not None:
+            _archive_cache.set(claim_hash, entry)
+    return entry
+
+def read_alias_entry_cached(alias_hash):
+    """Archived entry reached through a local-key alias, served from the LRU cache when possible."""
+    _sync_archive_cache()
+    cache_key = ("alias", alias_hash)
+    entry = _archive_cache.get(cache_key)
+    if entry is None:
+        claim_hash = read_alias(alias_hash)
+        entry = read_entry(claim_hash) if claim_hash else None
+        if entry is not None:
+            _archive_cache.set(cache_key, entry)
+    return entry
+
+def write_alias_cached(alias_hash, claim_hash, entry):
+    """write_alias that also primes the in-process cache with the aliased entry."""
+    write_alias(alias_hash, claim_hash)
+    with _archive_cache_lock:
+        _archive_cache.set(("alias", alias_hash), entry)
+
+def write_entry_cached(claim_hash, entry):
+    """write_entry that keeps the in-process cache current."""
+    global _archive_cache_generation
+    generation = write_entry(claim_hash, entry)
+    with _archive_cache_lock:
+        # Our own write should not flush the whole cache on the next read,
+        # unless another process wrote in between
+        if generation is not None and _archive_cache_generation == generation - 1:
+            _archive_cache_generation = generation
+        _archive_cache.set(claim_hash, entry)
+
+def _sync_claim_index():
+    """Index archive rows added since the last sync, by this or any other process."""
+    global _claim_index_rowid
+    with _claim_index_lock:
         try:
-            with open(ARCHIVE_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    return {}
+            rows = get_connection().execute(
+                "SELECT rowid, claim_hash, COALESCE(normalized_claim, json_extract(data, '$.claim_preview')),"
+                " json_extract(data, '$.claim_preview')"
+                " FROM analyses WHERE rowid > ? ORDER BY rowid",
+                (_claim_index_rowid,)
+            ).fetchall()
+        except Exception as e:
+            print(f"Error indexing archive: {e}")
+            return
+        for rowid, claim_hash, text, preview in rows:
+            _claim_index.add(claim_hash, text, preview)
+            _claim_index_rowid = rowid
 
-def save_archive(archive_data):
-    """Save the archive to JSON file."""
+def find_similar_claim(normalized_claim, threshold=None, claim=None):
+    """
+    Find the archived claim closest to normalized_claim whose negations,
+    numbers, antonyms and names agree with claim, the original wording.
+    Returns (claim_hash, similarity); claim_hash is None below the threshold.
+    """
+    threshold = SIMILARITY_THRESHOLD if threshold is None else threshold
+    _sync_claim_index()
+    # Archived claims are compared by their 200-character claim_preview
+    return _claim_index.query(normalized_claim, threshold, claim[:200] if claim else None)
+
+def get_archive_cache_stats():
+    """Hit/miss/eviction counters of the in-process archive cache."""
+    return _archive_cache.stats()
+
+def read_alias(alias_hash, db_path=None):
+    """Claim hash recorded for a local canonical key, or None."""
     try:
-        with open(ARCHIVE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(archive_data, f, indent=2, ensure_ascii=False)
+        row = get_connection(db_path).execute(
+            "SELECT claim_hash FROM claim_aliases WHERE alias_hash = ?", (alias_hash,)
+        ).fetchone()
+    except Exception as e:
+        print(f"Error reading archive: {e}")
+        return None
+    return row[0] if row else None
+
+def write_alias(alias_hash, claim_hash, db_path=None):
+    """Point a local canonical key at an archived claim."""
+    try:
+        conn = get_connection(db_path)
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO claim_aliases (alias_hash, claim_hash) VALUES (?, ?)",
+                (alias_hash, claim_hash)
+            )
     except Exception as e:
         print(f"Error saving archive: {e}")
 
-def get_cached_analysis(text, client=None):
+def acquire_claim_lock(lock_key, owner, ttl):
+    """
+    Try to become the one process verifying lock_key. Expired locks are
+    taken over. Returns True if the lock is ours; if the database is
+    unusable we fail open and return True.
+    """
+    now = time.time()
+    try:
+        conn = get_connection(CLAIM_LOCK_DB)
+        with conn:
+            conn.execute("DELETE FROM claim_locks WHERE lock_key = ? AND expires_at < ?", (lock_key, now))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO claim_locks (lock_key, owner, expires_at) VALUES (?, ?, ?)",
+                (lock_key, owner, now + ttl)
+            )
+        return cursor.rowcount == 1
+    except Exception as e:
+        print(f"Error acquiring claim lock: {e}")
+        return True
+
+def claim_lock_held(lock_key):
+    """Whether some process currently holds an unexpired lock on lock_key."""
+    try:
+        row = get_connection(CLAIM_LOCK_DB).execute(
+            "SELECT 1 FROM claim_locks WHERE lock_key = ? AND expires_at >= ?", (lock_key, time.time())
+        ).fetchone()
+    except Exception:
+        return False
+    return row is not None
+
+def release_claim_lock(lock_key, owner):
+    """Release a lock taken with acquire_claim_lock."""
+    try:
+        conn = get_connection(CLAIM_LOCK_DB)
+        with conn:
+            conn.execute("DELETE FROM claim_locks WHERE lock_key = ? AND owner = ?", (lock_key, owner))
+    except Exception as e:
+        print(f"Error releasing claim lock: {e}")
+
+# ---------- Verification jobs ----------
+# Job states: queued -> running -> done | failed
+JOB_ACTIVE_STATES = ("queued", "running")
+# A running job not finished after this long is assumed lost with its worker
+JOB_STALE_AFTER = float(os.getenv("CRISISSAFE_JOB_STALE_AFTER", "300"))
+JOB_MAX_ATTEMPTS = 3
+# Finished jobs are kept this long for pollers, then purged
+JOB_RETENTION = float(os.getenv("CRISISSAFE_JOB_RETENTION", str(24 * 3600)))
+
+def _job_from_row(row):
+    job_id, claim, status, result, error, attempts, created_at, finished_at = row
+    return {
+        "job_id": job_id,
+        "claim": claim,
+        "status": status,
+        "result": json.loads(result) if result else None,
+        "error": error,
+        "attempts": attempts,
+        "created_at": created_at,
+        "finished_at": finished_at
+    }
+
+def enqueue_job(claim, lock_key):
+    """
+    Queue a verification of claim and return its job id. If the same claim
+    (by lock_key) is already queued or running, that job's id is returned.
+    Returns None if the database is unusable.
+    """
+    now = time.time()
+    try:
+        conn = get_connection(CLAIM_LOCK_DB)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT job_id FROM verification_jobs WHERE lock_key = ? AND status IN (?, ?)",
+                (lock_key, *JOB_ACTIVE_STATES)
+            ).fetchone()
+            if row is not None:
+                job_id = row[0]
+            else:
+                job_id = uuid.uuid4().hex
+                conn.execute(
+                    "INSERT INTO verification_jobs (job_id, claim, lock_key, status, created_at)"
+                    " VALUES (?, ?, ?, 'queued', ?)",
+                    (job_id, claim, lock_key, now)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return job_id
+    except Exception as e:
+        print(f"Error queueing verification job: {e}")
+        return None
+
+def claim_next_job(worker):
+    """
+    Take the oldest queued job for worker; returns (job_id, claim) or None.
+    Jobs whose worker went silent for JOB_STALE_AFTER are queued again, up
+    to JOB_MAX_ATTEMPTS, and old finished jobs are purged on the way.
+    """
+    now = time.time()
+    try:
+        conn = get_connection(CLAIM_LOCK_DB)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            stale = now - JOB_STALE_AFTER
+            conn.execute(
+                "UPDATE verification_jobs SET status = 'failed', error = 'Worker lost', finished_at = ?"
+                " WHERE status = 'running' AND started_at < ? AND attempts >= ?",
+                (now, stale, JOB_MAX_ATTEMPTS)
+            )
+            conn.execute(
+                "UPDATE verification_jobs SET status = 'queued', worker = NULL"
+                " WHERE status = 'running' AND started_at < ?",
+                (stale,)
+            )
+            conn.execute(
+                "DELETE FROM verification_jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+                (now - JOB_RETENTION,)
+            )
+            row = conn.execute(
+                "SELECT job_id, claim FROM verification_jobs WHERE status = 'queued'"
+                " ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE verification_jobs SET status = 'running', worker = ?, started_at = ?,"
+                    " attempts = attempts + 1 WHERE job_id = ?",
+                    (worker, now, row[0])
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return tuple(row) if row is not None else None
+    except Exception as e:
+        print(f"Error claiming verification job: {e}")
+        return None
+
+def finish_job(job_id, result=None, error=None):
+    """Record a job's outcome: a JSON-serialisable result, or an error message."""
+    try:
+        conn = get_connection(CLAIM_LOCK_DB)
+        with conn:
+            conn.execute(
+                "UPDATE verification_jobs SET status = ?, result = ?, error = ?, finished_at = ?"
+                " WHERE job_id = ?",
+                ("failed" if error is not None else "done",
+                 json.dumps(result) if result is not None else None,
+                 error, time.time(), job_id)
+            )
+    except Exception as e:
+        print(f"Error finishing verification job: {e}")
+
+def get_job(job_id):
+    """The job as a dict (status, result, error, ...), or None if unknown."""
+    try:
+        row = get_connection(CLAIM_LOCK_DB).execute(
+            "SELECT job_id, claim, status, result, error, attempts, created_at, finished_at"
+            " FROM verification_jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+    except Exception as e:
+        print(f"Error reading verification job: {e}")
+        return None
+    return _job_from_row(row) if row else None
+
+def count_active_jobs():
+    """Jobs queued or running across every process using the archive."""
+    try:
+        return get_connection(CLAIM_LOCK_DB).execute(
+            "SELECT COUNT(*) FROM verification_jobs WHERE status IN (?, ?)", JOB_ACTIVE_STATES
+        ).fetchone()[0]
+    except Exception:
+        return 0
+
+def load_archive():
+    """Load the whole archive as a dict. Prefer read_entry for lookups."""
+    try:
+        rows = get_connection().execute("SELECT claim_hash, data FROM analyses").fetchall()
+    except Exception:
+        return {}
+    return {claim_hash: json.loads(data) for claim_hash, data in rows}
+
+def save_archive(archive_data):
+    """Write every entry of an archive dict into the store."""
+    for claim_hash, entry in archive_data.items():
+        write_entry(claim_hash, entry)
+
+def get_cached_analysis(text, client=None, claim_key=None, local_only=False):
     """
     Check if analysis exists in archive.
     Returns (analysis_data, is_cached) tuple.
     If cached, returns the data and True. Otherwise returns (None, False).
     Uses semantic normalization to match similar claims.
+    Pass the request's claim_key to reuse its normalization in store_analysis.
+    The local canonical key is tried first; the AI normalizer only runs
+    when it misses. With local_only=True no AI normalization is attempted.
     """
-    claim_hash = get_claim_hash(text, client)
-    archive = load_archive()
+    claim_key = claim_key or ClaimKey(text, client)
+    entry = read_alias_entry_cached(claim_key.local_hash)
+    if entry is not None:
+        return entry, True
+    if local_only:
+        return None, False
     
-    if claim_hash in archive:
-        return archive[claim_hash], True
+    match_hash = claim_key.hash
+    entry = read_entry_cached(match_hash)
+    if entry is not None:
+        # Remember the match so this wording hits the local key next time
+        write_alias_cached(claim_key.local_hash, match_hash, entry)
+        return entry, True
+    
+    # Fall back to a near-duplicate of an already verified claim. Not made
+    # an alias: the local key is trusted without any check, a fuzzy match is not.
+    if SIMILARITY_THRESHOLD <= 1.0:
+        match_hash, _ = find_similar_claim(claim_key.normalized, claim=claim_key.text)
+        if match_hash is not None:
+            entry = read_entry_cached(match_hash)
+            if entry is not None:
+                return entry, True
     return None, False
 
-def store_analysis(text, analysis_result, client=None):
+def store_analysis(text, analysis_result, client=None, claim_key=None):
     """
     Store analysis result in archive.
     analysis_result should be a dict with: score, flags, ai_report, is_subjective
-    Uses semantic normalization to store claims in canonical form.
+    Uses semantic normalization to store claims in canonical form. If the
+    AI normalization failed (say, it timed out behind the rate limit) the
+    entry is stored under the exact-text hash instead: its basic stand-in
+    is not the key later, AI-normalized lookups of the claim would use.
     """
-    claim_hash = get_claim_hash(text, client)
-    archive = load_archive()
-    
-    # Get normalized form for storage
-    normalized_claim = normalize_claim_semantically(text, client)
+    claim_key = claim_key or ClaimKey(text, client)
+    claim_hash = get_exact_hash(text) if claim_key.fell_back else claim_key.hash
     
-    archive[claim_hash] = {
+    entry = {
         **analysis_result,
         "timestamp": datetime.now().isoformat(),
         "claim_preview": text[:200],  # Store original text preview
-        "normalized_claim": normalized_claim  # Store normalized form for reference
+        "normalized_claim": claim_key.normalized  # Store normalized form for reference
     }
-    
-    save_archive(archive)
+    # Alias first: only the entry write moves the generation other processes watch
+    write_alias_cached(claim_key.local_hash, claim_hash, entry)
+    write_entry_cached(claim_hash, entry)
+
+
+if __name__ == "__main__":
+    written = migrate_json_archive(overwrite="--overwrite" in sys.argv)
+    print(f"Migrated {written} entries from {ARCHIVE_FILE} into {ARCHIVE_DB}")
 
@@ -0,0 +1,168 @@
+import argparse
+import csv
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+
+from archive import get_exact_hash
+from ruleengine import style_features
+from rules import (
+    RESULT_FIELDS, analyze_content, pending_verifications, set_verdict_batching, wait_for_verifications
+)
+
+# Column / key names accepted for the claim text in input files
+CLAIM_FIELDS = ("claim", "text", "message", "content")
+
+
+def _claim_from_record(record):
+    if isinstance(record, str):
+        return record
+    if isinstance(record, dict):
+        for field in CLAIM_FIELDS:
+            if record.get(field):
+                return str(record[field])
+    return None
+
+
+def read_claims(path):
+    """
+    Read claims from a JSONL or CSV file ("-" for stdin).
+    JSONL lines may be plain strings or objects with a claim/text field;
+    CSV files need a claim/text column, otherwise the first column is used.
+    """
+    handle = sys.stdin if path == "-" else open(path, "r", encoding="utf-8", newline="")
+    try:
+        if path.lower().endswith(".csv"):
+            reader = csv.reader(handle)
+            header = next(reader, None)
+            if header is None:
+                return []
+            lowered = [h.strip().lower() for h in header]
+            column = next((lowered.index(f) for f in CLAIM_FIELDS if f in lowered), None)
+            rows = list(reader)
+            if column is None:
+                # No recognised header: treat it as data and use the first column
+                column = 0
+                rows.insert(0, header)
+            return [row[column] for row in rows if len(row) > column and row[column].strip()]
+
+        claims = []
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                claim = _claim_from_record(json.loads(line))
+            except json.JSONDecodeError:
+                claim = line
+            if claim and claim.strip():
+                claims.append(claim)
+        return claims
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def verify_batch(claims, workers=8, analyze=analyze_content):
+    """
+    Verify many claims with bounded concurrency.
+    Claims that differ only in case and whitespace are deduplicated before
+    any work is done, so each distinct claim is analyzed once; other
+    rewordings are left to the archive. Yields
+    (index, claim, exact_hash, result_dict, duplicate_of) in input order,
+    where exact_hash is get_exact_hash(claim) (not the archive claim_hash),
+    followed by a final stats dict under index None.
+    """
+    started = time.monotonic()
+    keys = [get_exact_hash(claim) for claim in claims]
+    first_index = {}
+    for i, key in enumerate(keys):
+        first_index.setdefault(key, i)
+    unique = sorted(first_index.values())
+
+    results = {}
+    errors = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as executor:
+        futures = {executor.submit(analyze, claims[i]): i for i in unique}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = dict(zip(RESULT_FIELDS, future.result()))
+            except Exception as e:
+                errors += 1
+                results[i] = {"error": str(e)}
+
+    for i, claim in enumerate(claims):
+        source = first_index[keys[i]]
+        yield i, claim, keys[i], results[source], (source if source != i else None)
+
+    elapsed = time.monotonic() - started
+    from_archive = sum(1 for i in unique if results[i].get("is_from_archive"))
+    yield None, None, None, {
+        "claims": len(claims),
+        "unique_claims": len(unique),
+        "errors": errors,
+        "elapsed_seconds": elapsed,
+        "claims_per_second": len(claims) / elapsed if elapsed else 0.0,
+        "cache_hit_ratio": from_archive / len(unique) if unique else 0.0,
+    }, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify a file of claims and write JSONL results.")
+    parser.add_argument("input", help="JSONL or CSV file of claims ('-' for JSONL on stdin)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file (default: stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=8, help="concurrent verifications (default: 8)")
+    parser.add_argument("--pack", type=int, default=1,
+                        help="fact-check up to N claims per LLM request (default: 1, no packing)")
+    parser.add_argument("--features", action="store_true",
+                        help="only compute the local heuristic features and write them as CSV (no network)")
+    parser.add_argument("--triage", action="store_true",
+                        help="write provisional rule-only results at once and run the full checks in the background")
+    args = parser.parse_args(argv)
+
+    if args.features:
+        started = time.monotonic()
+        claims = read_claims(args.input)
+        features = style_features(claims)
+        features.insert(0, "claim", claims)
+        features.to_csv(sys.stdout if args.output == "-" else args.output, index=False)
+        elapsed = time.monotonic() - started
+        print(f"Computed features for {len(claims)} claims in {elapsed:.2f}s", file=sys.stderr)
+        return
+
+    if args.pack > 1:
+        set_verdict_batching(args.pack)
+
+    analyze = partial(analyze_content, mode="triage") if args.triage else analyze_content
+    claims = read_claims(args.input)
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for index, claim, exact_hash, result, duplicate_of in verify_batch(claims, args.workers, analyze):
+            if index is None:
+                stats = result
+                continue
+            record = {"index": index, "claim": claim, "exact_hash": exact_hash, **result}
+            if duplicate_of is not None:
+                record["duplicate_of"] = duplicate_of
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(
+        f"Verified {stats['claims']} claims ({stats['unique_claims']} unique, {stats['errors']} errors) "
+        f"in {stats['elapsed_seconds']:.1f}s: {stats['claims_per_second']:.1f} claims/sec, "
+        f"archive hit ratio {stats['cache_hit_ratio']:.0%}",
+        file=sys.stderr
+    )
+    if args.triage and pending_verifications():
+        print(f"Running {pending_verifications()} full verifications in the background into the archive...",
+              file=sys.stderr)
+        wait_for_verifications()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+import asyncio
+import os
+import re
+import threading
+import time
+import weakref
+from urllib.parse import unquote_plus, urlsplit, urlunsplit
+
+import httpx
+from lxml import etree
+from newspaper import Article
+
+from cache import LRUCache
+
+# Fetch limits so a slow or huge page cannot stall a worker
+ARTICLE_TIMEOUT = float(os.getenv("CRISISSAFE_ARTICLE_TIMEOUT", "10"))
+ARTICLE_MAX_BYTES = int(os.getenv("CRISISSAFE_ARTICLE_MAX_BYTES", str(2 * 1024 * 1024)))
+ARTICLE_USER_AGENT = "Mozilla/5.0 (compatible; CrisisSafe/1.0)"
+
+# Extracted text is reused for ARTICLE_CACHE_TTL seconds; after that the
+# stored ETag / Last-Modified let us revalidate with a conditional request.
+ARTICLE_CACHE_TTL = float(os.getenv("CRISISSAFE_ARTICLE_CACHE_TTL", "3600"))
+ARTICLE_CACHE_SIZE = int(os.getenv("CRISISSAFE_ARTICLE_CACHE_SIZE", "512"))
+
+# "stream" reads body text incrementally with lxml and stops once enough is
+# collected; "newspaper" always runs the full newspaper3k pipeline.
+ARTICLE_EXTRACTOR = os.getenv("CRISISSAFE_ARTICLE_EXTRACTOR", "stream")
+# The verdict prompt keeps the first 1500 characters, so stop a bit past that
+ARTICLE_TARGET_CHARS = int(os.getenv("CRISISSAFE_ARTICLE_TARGET_CHARS", "2000"))
+# Pages that yield less than this from the stream go through newspaper3k
+ARTICLE_MIN_CHARS = int(os.getenv("CRISISSAFE_ARTICLE_MIN_CHARS", "200"))
+
+# Links fetched per submission; forwarded messages rarely need more
+ARTICLE_MAX_URLS = int(os.getenv("CRISISSAFE_ARTICLE_MAX_URLS", "5"))
+
+_article_cache = LRUCache(ARTICLE_CACHE_SIZE)
+_http_client = None
+_http_client_lock = threading.Lock()
+_async_http_clients = weakref.WeakKeyDictionary()
+
+
+class ArticleTooLarge(Exception):
+    pass
+
+
+def _get_http_client():
+    """Pooled HTTP client shared by every synchronous article fetch."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                follow_redirects=True,
+                timeout=ARTICLE_TIMEOUT,
+                headers={"User-Agent": ARTICLE_USER_AGENT},
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+            )
+        return _http_client
+
+
+def _get_async_http_client():
+    """Pooled httpx.AsyncClient shared by every fetch on the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_http_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=ARTICLE_TIMEOUT,
+            headers={"User-Agent": ARTICLE_USER_AGENT},
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+        )
+        _async_http_clients[loop] = client
+    return client
+
+
+# ==================== URL HANDLING ====================
+
+_URL_PATTERN = re.compile(r'https?://\S+')
+_URL_TRAILING = ".,;:!?'\")]}>"
+_URL_BRACKETS = {")": "(", "]": "[", "}": "{"}
+_TRACKING_PREFIXES = ("utm_", "mc_", "pk_")
+_TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "igshid", "yclid",
+                    "_ga", "_gl", "ref_src", "ref_url", "si", "cmpid", "ocid"}
+
+
+def normalize_url(url):
+    """
+    Canonical form of a link: lowercase scheme/host, no fragment and no
+    tracking parameters, so shared copies of one article compare equal.
+    """
+    parts = urlsplit(url)
+    # Kept parameters stay byte for byte as written; only whole segments are dropped
+    query = "&".join(
+        segment for segment in parts.query.split("&")
+        if segment and not _is_tracking_param(unquote_plus(segment.split("=", 1)[0]).lower())
+    )
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, ""))
+
+
+def _is_tracking_param(name):
+    return name in _TRACKING_PARAMS or name.startswith(_TRACKING_PREFIXES)
+
+
+def _strip_url_trailing(url):
+    """
+    Drop sentence punctuation after a link. A closing bracket is only
+    dropped when unbalanced, so ".../Cyclone_Fani_(2019)" keeps its ")".
+    """
+    while url and url[-1] in _URL_TRAILING:
+        opener = _URL_BRACKETS.get(url[-1])
+        if opener and url.count(opener) >= url.count(url[-1]):
+            break
+        url = url[:-1]
+    return url
+
+
+def extract_urls(text):
+    """Distinct normalized links in a message, in order of appearance."""
+    urls = []
+    for match in _URL_PATTERN.finditer(text):
+        try:
+            url = normalize_url(_strip_url_trailing(match.group(0)))
+        except ValueError:
+            continue
+        if url not in urls:
+            urls.append(url)
+        if len(urls) >= ARTICLE_MAX_URLS:
+            break
+    return urls
+
+
+def _conditional_headers(entry):
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def _decode(response, body):
+    return body.decode(response.encoding or "utf-8", errors="replace")
+
+
+def _check_size(response, received, started):
+    """Abort downloads that exceed the size cap or the total time budget."""
+    declared = response.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > ARTICLE_MAX_BYTES:
+        raise ArticleTooLarge(f"{declared} bytes exceeds {ARTICLE_MAX_BYTES}")
+    if received > ARTICLE_MAX_BYTES:
+        raise ArticleTooLarge(f"more than {ARTICLE_MAX_BYTES} bytes")
+    if time.monotonic() - started > ARTICLE_TIMEOUT:
+        raise TimeoutError(f"download took longer than {ARTICLE_TIMEOUT}s")
+
+
+# ==================== STREAMING EXTRACTOR ====================
+
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "nav", "header",
+              "footer", "aside", "form", "button", "select", "iframe"}
+_BLOCK_TAGS = {"p", "h1", "h2", "h3", "h4", "li", "blockquote", "pre", "td"}
+# Shorter blocks are usually menu entries, captions or share buttons
+_MIN_BLOCK_CHARS = 40
+
+
+class StreamingTextExtractor:
+    """
+    Incremental body-text extractor built on lxml's HTMLPullParser.
+
+    Chunks are fed as they arrive; paragraph-like blocks outside of
+    navigation/script chrome are collected and then cleared from the tree,
+    so memory stays flat and the download can stop as soon as `done`.
+    """
+
+    def __init__(self, encoding=None, target_chars=None):
+        self.target_chars = target_chars or ARTICLE_TARGET_CHARS
+        self._parser = etree.HTMLPullParser(events=("start", "end"), encoding=encoding,
+                                            remove_comments=True, no_network=True)
+        self._skip_depth = 0
+        self._blocks = []
+        self._chars = 0
+
+    @property
+    def done(self):
+        return self._chars >= self.target_chars
+
+    @property
+    def text(self):
+        return "\n\n".join(self._blocks)
+
+    def feed(self, chunk):
+        """Parse one chunk of HTML; returns True once enough text is collected."""
+        if self.done:
+            return True
+        self._parser.feed(chunk)
+        self._consume()
+        return self.done
+
+    def close(self):
+        """Flush the parser at end of document and return the collected text."""
+        if not self.done:
+            try:
+                self._parser.close()
+            except etree.LxmlError:
+                pass
+            self._consume()
+        return self.text
+
+    def _consume(self):
+        for event, element in self._parser.read_events():
+            tag = element.tag if isinstance(element.tag, str) else ""
+            if tag in _SKIP_TAGS:
+                if event == "start":
+                    self._skip_depth += 1
+                else:
+                    self._skip_depth -= 1
+                    element.clear(keep_tail=True)
+            elif event == "end" and tag in _BLOCK_TAGS:
+                if not self._skip_depth:
+                    self._collect(tag, element)
+                element.clear(keep_tail=True)
+            if self.done:
+                break
+
+    def _collect(self, tag, element):
+        block = " ".join("".join(element.itertext()).split())
+        if not block:
+            return
+        if len(block) < _MIN_BLOCK_CHARS and not tag.startswith("h"):
+            return
+        self._blocks.append(block)
+        self._chars += len(block)
+
+
+class _ArticleDownload:
+    """Accumulates a streamed response, enforcing caps and feeding the extractor."""
+
+    def __init__(self, response, started):
+        self.response = response
+        self.started = started
+        self.chunks = []
+        self.received = 0
+        self.extractor = None
+        if ARTICLE_EXTRACTOR == "stream":
+            self.extractor = StreamingTextExtractor(encoding=response.charset_encoding)
+        _check_size(response, 0, started)
+
+    def feed(self, chunk):
+        """Take one chunk; returns True when the rest of the body is not needed."""
+        self.chunks.append(chunk)
+        self.received += len(chunk)
+        if self.extractor and self.extractor.feed(chunk):
+            return True
+        _check_size(self.response, self.received, self.started)
+        return False
+
+    def streamed_text(self):
+        """Text from the streaming extractor, or None if newspaper3k should take over."""
+        if self.extractor is None:
+            return None
+        try:
+            text = self.extractor.close()
+        except Exception as e:
+            print(f"Streaming extraction error: {e}")
+            return None
+        return text if len(text) >= ARTICLE_MIN_CHARS else None
+
+    def html(self):
+        return _decode(self.response, b"".join(self.chunks))
+
+
+def parse_article_html(url, html):
+    """Run newspaper3k's parser over already downloaded HTML."""
+    article = Article(url, language='en')
+    article.download(input_html=html)
+    article.parse()
+    return article.text
+
+
+def _cached_text(url):
+    """(entry, fresh) for a URL; entry may be stale but still carry validators."""
+    entry = _article_cache.get(url)
+    if entry is None:
+        return None, False
+    return entry, time.monotonic() - entry["fetched_at"] < ARTICLE_CACHE_TTL
+
+
+def _store(url, response, text):
+    _article_cache.set(url, {
+        "text": text,
+        "etag": response.headers.get("etag"),
+        "last_modified": response.headers.get("last-modified"),
+        "fetched_at": time.monotonic(),
+    })
+
+
+def _revalidated(url, entry):
+    """The server answered 304: keep the cached text and restart its TTL."""
+    _article_cache.set(url, {**entry, "fetched_at": time.monotonic()})
+    return entry["text"]
+
+
+def extract_article_content(url):
+    """
+    Extract text content from a URL.
+    Body text is streamed through StreamingTextExtractor and the download
+    stops once enough is collected; pages it cannot handle fall back to
+    newspaper3k. Results are cached per URL; stale entries are revalidated
+    with a conditional request, and downloads are capped in size and time.
+    """
+    entry, fresh = _cached_text(url)
+    if fresh:
+        return entry["text"]
+    try:
+        started = time.monotonic()
+        with _get_http_client().stream("GET", url, headers=_conditional_headers(entry)) as response:
+            if response.status_code == 304 and entry:
+                return _revalidated(url, entry)
+            response.raise_for_status()
+            download = _ArticleDownload(response, started)
+            for chunk in response.iter_bytes():
+                if download.feed(chunk):
+                    break
+        text = download.streamed_text()
+        if text is None:
+            text = parse_article_html(url, download.html())
+        _store(url, response, text)
+        return text
+    except Exception as e:
+        print(f"Article extraction error: {e}")
+        return None
+
+
+async def extract_article_content_async(url):
+    """Async extract_article_content: same cache and limits, parsing off the event loop."""
+    entry, fresh = _cached_text(url)
+    if fresh:
+        return entry["text"]
+    try:
+        started = time.monotonic()
+        http = _get_async_http_client()
+        async with http.stream("GET", url, headers=_conditional_headers(entry)) as response:
+            if response.status_code == 304 and entry:
+                return _revalidated(url, entry)
+            response.raise_for_status()
+            download = _ArticleDownload(response, started)
+            async for chunk in response.aiter_bytes():
+                if download.feed(chunk):
+                    break
+        text = download.streamed_text()
+        if text is None:
+            text = await asyncio.to_thread(parse_article_html, url, download.html())
+        _store(url, response, text)
+        return text
+    except Exception as e:
+        print(f"Article extraction error: {e}")
+        return None
+
+
+def get_article_cache_stats():
+    """Hit/miss/eviction counters of the article cache."""
+    return _article_cache.stats()
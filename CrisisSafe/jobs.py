@@ -0,0 +1,109 @@
+import os
+import sys
+import threading
+import time
+
+from archive import JOB_ACTIVE_STATES, claim_next_job, enqueue_job, finish_job, get_job
+
+# Background verification workers per process. Every session without an
+# archived verdict waits on a job, so the default matches the request-path
+# pipeline executor rather than leaving sessions queued behind a couple of threads
+JOB_WORKERS = int(os.getenv("CRISISSAFE_BACKGROUND_WORKERS", "8"))
+# How often idle workers look for jobs queued by other processes, and pollers re-check
+JOB_POLL_INTERVAL = float(os.getenv("CRISISSAFE_JOB_POLL_INTERVAL", "1.0"))
+
+
+def _is_shutdown_error(error):
+    """Whether error comes from the process exiting, not from the job itself."""
+    return sys.is_finalizing() or (isinstance(error, RuntimeError) and "shutdown" in str(error))
+
+
+class JobWorkers:
+    """
+    Worker threads draining the verification_jobs table (in CLAIM_LOCK_DB).
+
+    handler(claim) runs the verification and returns a JSON-serialisable
+    result, which is stored on the job row. Jobs live in SQLite, so any
+    process with workers running picks up claims queued by the others, and
+    jobs left behind by a process that exited are resumed by the next one.
+    Workers start on the first submit; idle ones wake on a local submit or
+    every poll_interval.
+    """
+
+    def __init__(self, handler, workers=JOB_WORKERS, poll_interval=JOB_POLL_INTERVAL):
+        self.handler = handler
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._cond = threading.Condition()
+        self._threads = []
+        self._submitted = set()
+
+    def start(self):
+        """Start the worker threads if they are not running yet."""
+        with self._cond:
+            if self._threads:
+                return
+            for n in range(self.workers):
+                name = f"verify-{os.getpid()}-{n}"
+                thread = threading.Thread(target=self._run, args=(name,), name=name, daemon=True)
+                self._threads.append(thread)
+                thread.start()
+
+    def submit(self, claim, lock_key):
+        """
+        Queue claim and return its job id; a claim already queued or running
+        shares its job. Returns None if the job table is unusable.
+        """
+        job_id = enqueue_job(claim, lock_key)
+        if job_id is None:
+            return None
+        self.start()
+        with self._cond:
+            self._submitted.add(job_id)
+            self._cond.notify_all()
+        return job_id
+
+    def _run(self, name):
+        while True:
+            job = claim_next_job(name)
+            if job is None:
+                with self._cond:
+                    self._cond.wait(self.poll_interval)
+                continue
+            job_id, claim = job
+            try:
+                finish_job(job_id, result=self.handler(claim))
+            except Exception as e:
+                if _is_shutdown_error(e):
+                    # Leave the job running: once stale, claim_next_job queues it
+                    # again for the next process
+                    print(f"Verification job {job_id} interrupted by shutdown: {e}")
+                    return
+                print(f"Verification job {job_id} failed: {e}")
+                finish_job(job_id, error=str(e))
+            with self._cond:
+                self._cond.notify_all()
+
+    def pending(self):
+        """Jobs submitted from this process that are still queued or running."""
+        with self._cond:
+            job_ids = list(self._submitted)
+        active = set()
+        for job_id in job_ids:
+            job = get_job(job_id)
+            if job is not None and job["status"] in JOB_ACTIVE_STATES:
+                active.add(job_id)
+        with self._cond:
+            self._submitted &= active | (self._submitted - set(job_ids))
+        return len(active)
+
+    def wait(self, timeout=None):
+        """Block until every job submitted from this process has finished (or timeout passes)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.pending():
+            remaining = self.poll_interval if deadline is None else min(self.poll_interval, deadline - time.monotonic())
+            if remaining <= 0:
+                return False
+            with self._cond:
+                self._cond.wait(remaining)
+        return True
@@ -1,7 +1,12 @@
 import streamlit as st
-from rules import analyze_content
+from jobs import JOB_POLL_INTERVAL
+from rules import (
+    ANALYSIS_MODE, RESULT_FIELDS, analyze_content, get_verification, submit_verification, triage_content
+)
 from datetime import datetime
+from PIL import Image
 import base64
+import io
 import random
 import os
 import textwrap
@@ -15,48 +20,85 @@ st.set_page_config(
 )
 
 # ---------------- BACKGROUND IMAGES LOGIC ----------------
-def get_base64_of_bin_file(bin_file):
-    with open(bin_file, 'rb') as f:
-        data = f.read()
-    return base64.b64encode(data).decode()
+# The floating papers are drawn at most 400px wide and 20% opaque, so each
+# PNG is downscaled to WebP (which keeps the transparency) once per process
+# rather than inlined at full size on every rerun. With Streamlit's
+# server.enableStaticServing on, the files go to ./static and the browser
+# fetches and caches them instead of receiving them over the websocket.
+BACKGROUND_SIZE = 400
+BACKGROUND_QUALITY = 70
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(APP_DIR, "static")
 
 background_images = [
     "Newspaper1.png", "Newspaper2.png", "magazine1.png", "newspaper3.png", "poster1.png"
 ]
 
+def encode_background(img_name):
+    """The image downscaled to BACKGROUND_SIZE as WebP bytes."""
+    with Image.open(os.path.join(APP_DIR, img_name)) as img:
+        img.thumbnail((BACKGROUND_SIZE, BACKGROUND_SIZE))
+        buffer = io.BytesIO()
+        img.save(buffer, "WEBP", quality=BACKGROUND_QUALITY)
+    return buffer.getvalue()
+
+@st.cache_resource(show_spinner=False)
+def get_background_urls():
+    """{index: CSS url} of every background image, computed once per process."""
+    use_static = st.get_option("server.enableStaticServing")
+    urls = {}
+    for i, img_name in enumerate(background_images):
+        if not os.path.exists(os.path.join(APP_DIR, img_name)):
+            continue
+        try:
+            data = encode_background(img_name)
+        except Exception as e:
+            print(f"Background image error ({img_name}): {e}")
+            continue
+        if use_static:
+            static_name = os.path.splitext(img_name)[0] + ".webp"
+            try:
+                os.makedirs(STATIC_DIR, exist_ok=True)
+                with open(os.path.join(STATIC_DIR, static_name), "wb") as f:
+                    f.write(data)
+                urls[i] = f"app/static/{static_name}"
+                continue
+            except OSError as e:
+                print(f"Static background unavailable, inlining it: {e}")
+        urls[i] = f"data:image/webp;base64,{base64.b64encode(data).decode()}"
+    return urls
+
 bg_css = ""
-for i, img_name in enumerate(background_images):
-    if os.path.exists(img_name):
-        b64_data = get_base64_of_bin_file(img_name)
-        # Random parameters for organic feel
-        top = random.randint(0, 90)
-        left = random.randint(0, 90)
-        width = random.randint(200, 400)
-        rotation = random.randint(-20, 20)
-        duration = random.randint(20, 60) # Slow movement
-        
-        bg_css += f"""
-        .floating-bg-{i} {{
-            position: fixed;
-            top: {top}vh;
-            left: {left}vw;
-            width: {width}px;
-            opacity: 0.2;
-            transform: rotate({rotation}deg);
-            z-index: 0;
-            pointer-events: none;
-            animation: float-{i} {duration}s infinite alternate ease-in-out;
-            background-image: url("data:image/png;base64,{b64_data}");
-            background-size: contain;
-            background-repeat: no-repeat;
-            height: {width}px; /* Appr aspect ratio */
-        }}
-        
-        @keyframes float-{i} {{
-            0% {{ transform: rotate({rotation}deg) translate(0, 0); }}
-            100% {{ transform: rotate({rotation + 5}deg) translate({random.randint(-20, 20)}px, {random.randint(-20, 20)}px); }}
-        }}
-        """
+for i, bg_url in get_background_urls().items():
+    # Random parameters for organic feel
+    top = random.randint(0, 90)
+    left = random.randint(0, 90)
+    width = random.randint(200, 400)
+    rotation = random.randint(-20, 20)
+    duration = random.randint(20, 60) # Slow movement
+    
+    bg_css += f"""
+    .floating-bg-{i} {{
+        position: fixed;
+        top: {top}vh;
+        left: {left}vw;
+        width: {width}px;
+        opacity: 0.2;
+        transform: rotate({rotation}deg);
+        z-index: 0;
+        pointer-events: none;
+        animation: float-{i} {duration}s infinite alternate ease-in-out;
+        background-image: url("{bg_url}");
+        background-size: contain;
+        background-repeat: no-repeat;
+        height: {width}px; /* Appr aspect ratio */
+    }}
+    
+    @keyframes float-{i} {{
+        0% {{ transform: rotate({rotation}deg) translate(0, 0); }}
+        100% {{ transform: rotate({rotation + 5}deg) translate({random.randint(-20, 20)}px, {random.randint(-20, 20)}px); }}
+    }}
+    """
 
 # ---------------- VICTORIAN IMPERIAL NEWSPAPER CSS ----------------
 # Dynamic CSS for background
@@ -373,6 +415,14 @@ body, .stApp {
     text-transform: uppercase;
 }
 
+.status-pending {
+    color: #8b7355;
+    font-style: italic;
+    font-size: 0.8rem;
+    font-family: 'Old Standard TT', serif;
+    text-transform: uppercase;
+}
+
 .status-na {
     color: #666;
     font-style: italic;
@@ -659,22 +709,54 @@ user_input = st.text_area(
 # ---------------- ANALYSIS ----------------
 if st.button("VERIFY CLAIM", use_container_width=True):
     if user_input.strip():
-        with st.spinner("Writing to the Imperial Archives..."):
-            score, flags, ai_report, is_subjective, is_from_archive, checklist, related_articles, pointers = analyze_content(user_input)
-
-        st.session_state.update({
-            "score": score,
-            "flags": flags,
-            "ai_report": ai_report,
-            "is_subjective": is_subjective,
-            "is_from_archive": is_from_archive,
-            "checklist": checklist,
-            "related_articles": related_articles,
-            "pointers": pointers
-        })
+        # Archived claims (and triage results) are answered at once; anything
+        # else is verified by a background job so this session is not blocked
+        result = dict(zip(RESULT_FIELDS, triage_content(user_input, schedule=False)))
+        job_id = None
+        if not result["is_from_archive"]:
+            job_id = submit_verification(user_input)
+            if job_id is None:
+                # No job table: verify inline as before
+                with st.spinner("Writing to the Imperial Archives..."):
+                    result = dict(zip(RESULT_FIELDS, analyze_content(user_input, mode="full")))
+            elif ANALYSIS_MODE != "triage":
+                result = None
+
+        st.session_state.pop("verification_error", None)
+        st.session_state["verification_job"] = job_id
+        if result is not None:
+            st.session_state.update(result)
+        else:
+            for key in RESULT_FIELDS:
+                st.session_state.pop(key, None)
     else:
         st.warning("Please enter content to verify.")
 
+@st.fragment(run_every=JOB_POLL_INTERVAL)
+def poll_verification():
+    """Re-check the background job; rerun the whole page once it has finished."""
+    job_id = st.session_state.get("verification_job")
+    if not job_id:
+        return
+    job = get_verification(job_id)
+    if job is not None and job["status"] in ("queued", "running"):
+        st.markdown(
+            "<div class='article-subhead' style='text-align:center'>⏳ Writing to the Imperial Archives...</div>",
+            unsafe_allow_html=True
+        )
+        return
+    st.session_state["verification_job"] = None
+    if job is not None and job["status"] == "done":
+        st.session_state.update(job["result"])
+    else:
+        st.session_state["verification_error"] = (job or {}).get("error") or "Verification job was lost."
+    st.rerun()
+
+if st.session_state.get("verification_job"):
+    poll_verification()
+if st.session_state.get("verification_error"):
+    st.error(f"Verification failed: {st.session_state.verification_error}")
+
 # ---------------- DISPLAY RESULTS ----------------
 if "score" in st.session_state:
     score = st.session_state.score
@@ -712,6 +794,23 @@ if "score" in st.session_state:
         ">
             📦 Retrieved from Archive
         </div>""")
+    elif st.session_state.get("checklist", {}).get("provisional"):
+        archive_html = textwrap.dedent("""
+        <div style="
+            position: absolute;
+            top: 0;
+            right: 0;
+            font-family: 'Old Standard TT', serif;
+            font-size: 0.75rem;
+            color: #8b7355;
+            font-style: italic;
+            padding: 4px 8px;
+            background: rgba(232, 227, 213, 0.6);
+            border-bottom: 1px solid #8b7355;
+            border-left: 1px solid #8b7355;
+        ">
+            ⏳ Provisional &mdash; Full Check Queued
+        </div>""")
 
     # Main Credibility Box
     # Main Credibility Box
@@ -827,7 +926,13 @@ with st.sidebar:
         st.markdown("<div class='checklist-container'>", unsafe_allow_html=True)
         
         for key, value in st.session_state.checklist.items():
+            if key == "provisional":
+                # Shown as a badge on the score instead
+                continue
             label = checklist_labels.get(key, key.replace("_", " ").title())
+            if key.startswith("url_extraction_"):
+                # One entry per link when a message carries several
+                label = f"Source Link {key.rsplit('_', 1)[1]}"
             
             if value is True:
                 status_html = "<span class='status-pass'>PASS</span>"
@@ -835,6 +940,8 @@ with st.sidebar:
                 status_html = "<span class='status-fail'>FAIL</span>"
             elif value == "uncertain":
                 status_html = "<span class='status-uncertain'>UNCERTAIN</span>"
+            elif value == "pending":
+                status_html = "<span class='status-pending'>PENDING</span>"
             else:
                 status_html = "<span class='status-na'>N/A</span>"
 
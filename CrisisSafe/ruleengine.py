@@ -0,0 +1,274 @@
+import json
+import os
+import re
+import threading
+
+import pandas as pd
+
+from subjectivity import subjectivity_batch
+from textbatch import TextBatch
+
+# Heuristic rules live in a JSON file so new rumour patterns can be added
+# without touching code; the file is reloaded when it changes on disk.
+RULES_FILE = os.getenv(
+    "CRISISSAFE_RULES_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.json")
+)
+
+STAGES = ("style", "sanity")
+
+# evaluate_batch works through long claim lists in chunks of this many texts
+BATCH_CHUNK_SIZE = int(os.getenv("CRISISSAFE_RULES_BATCH_CHUNK", "5000"))
+
+_SHOUTING_WORD = re.compile(r"\b[A-Z]{4,}\b")
+_PUNCTUATION_RUN = re.compile(r"!!+|\?\?+")
+# Both counting metrics in one scan; letters and punctuation never overlap,
+# so each finds exactly the matches its own findall would
+_COUNTED_METRICS = re.compile(
+    f"(?P<shouting_tokens>{_SHOUTING_WORD.pattern})|(?P<punctuation_runs>{_PUNCTUATION_RUN.pattern})"
+)
+
+
+def _uppercase_ratio(text):
+    words = text.split()
+    if not words:
+        return 0.0
+    return sum(1 for word in words if word.isupper() and len(word) > 1) / len(words)
+
+
+def _shouting_tokens(text):
+    return len(_SHOUTING_WORD.findall(text))
+
+
+def _punctuation_runs(text):
+    return len(_PUNCTUATION_RUN.findall(text))
+
+
+# Whole-text measurements a rule can threshold with "metric" / "above".
+# Each has a per-text function and the TextBatch method computing it for many texts.
+METRICS = {
+    "uppercase_ratio": _uppercase_ratio,
+    "shouting_tokens": _shouting_tokens,
+    "punctuation_runs": _punctuation_runs,
+}
+
+
+def _measure(text, names):
+    """Values of the named METRICS for text, with the regex counts from one scan."""
+    values = {name: 0 for name in names if name in _COUNTED_METRICS.groupindex}
+    if values:
+        for match in _COUNTED_METRICS.finditer(text):
+            if match.lastgroup in values:
+                values[match.lastgroup] += 1
+    for name in names:
+        if name not in values:
+            values[name] = METRICS[name](text)
+    return values
+
+
+BATCH_METRICS = {
+    "uppercase_ratio": TextBatch.uppercase_ratio,
+    "shouting_tokens": TextBatch.shouting_tokens,
+    "punctuation_runs": TextBatch.punctuation_runs,
+}
+
+
+def _keyword_pattern(keywords):
+    """Alternation of literal phrases that must not sit inside a longer word."""
+    phrases = sorted({k.lower() for k in keywords}, key=len, reverse=True)
+    return r"(?<!\w)(?:" + "|".join(re.escape(p) for p in phrases) + r")(?!\w)"
+
+
+def _normalize_rule(index, rule):
+    """Validate one rule from the config and fill in its defaults."""
+    rule = dict(rule)
+    rule.setdefault("id", f"rule_{index}")
+    kinds = [k for k in ("pattern", "keywords", "metric") if k in rule]
+    if len(kinds) != 1:
+        raise ValueError(f"Rule {rule['id']} needs exactly one of pattern, keywords or metric")
+    if rule.get("stage", "style") not in STAGES:
+        raise ValueError(f"Rule {rule['id']} has unknown stage {rule.get('stage')!r}")
+    if "metric" in rule and rule["metric"] not in METRICS:
+        raise ValueError(f"Rule {rule['id']} uses unknown metric {rule['metric']!r}")
+    if "keywords" in rule:
+        rule["pattern"] = _keyword_pattern(rule["keywords"])
+        rule.setdefault("case_sensitive", False)
+    if "pattern" in rule:
+        re.compile(rule["pattern"])  # Report a bad pattern against its own rule
+    rule.setdefault("stage", "style")
+    rule.setdefault("group", rule["id"])
+    rule.setdefault("min_matches", 1)
+    rule.setdefault("case_sensitive", False)
+    rule.setdefault("score_delta", 0)
+    rule["index"] = index
+    return rule
+
+
+class RuleMatches:
+    """The rules that fired for one text, in config order."""
+
+    def __init__(self, fired):
+        self.fired = fired
+
+    def __bool__(self):
+        return bool(self.fired)
+
+    def ids(self, stage=None):
+        return [r["id"] for r in self.fired if stage is None or r["stage"] == stage]
+
+    def passed(self, checklist_key):
+        """Checklist value for key: False if any rule reporting to it fired."""
+        return not any(r.get("checklist") == checklist_key for r in self.fired)
+
+    def apply(self, stage, score, flags):
+        """
+        Apply the score deltas, caps and flags of the rules fired in stage.
+        Only the first rule of each group counts, so alternative wordings of
+        one check never stack. Returns the new score.
+        """
+        seen_groups = set()
+        for rule in self.fired:
+            if rule["stage"] != stage or rule["group"] in seen_groups:
+                continue
+            seen_groups.add(rule["group"])
+            score += rule["score_delta"]
+            if "score_cap" in rule:
+                score = min(score, rule["score_cap"])
+            if rule.get("flag"):
+                flags.append(rule["flag"])
+        return score
+
+
+class RuleEngine:
+    """
+    Evaluates every configured rule against a text in one scan per case
+    tier: all case-sensitive patterns are folded into one regex and all
+    case-insensitive patterns and keyword sets into another.
+
+    Each rule is an optional zero-width lookahead in that regex, so at every
+    offset each rule is tried independently: matches of different rules may
+    overlap or start at the same offset, and every rule matching there is
+    counted, as in evaluate_batch.
+    """
+
+    def __init__(self, rules):
+        self.rules = [_normalize_rule(i, r) for i, r in enumerate(rules)]
+        self._metrics = sorted({r["metric"] for r in self.rules if "metric" in r})
+        self._tiers = []
+        for case_sensitive in (True, False):
+            members = [r for r in self.rules if "pattern" in r and r["case_sensitive"] == case_sensitive]
+            if members:
+                combined = "".join(f"(?:(?=(?P<r{r['index']}>{r['pattern']})))?" for r in members)
+                flags = 0 if case_sensitive else re.IGNORECASE
+                names = [f"r{r['index']}" for r in members]
+                self._tiers.append((re.compile(combined, flags), names))
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        return cls(config.get("rules", []))
+
+    def evaluate(self, text):
+        """Return the RuleMatches for text."""
+        counts = {}
+        for tier, names in self._tiers:
+            # The tier matches (empty) at every offset; lastindex is None where no rule did
+            for match in tier.finditer(text):
+                if match.lastindex is None:
+                    continue
+                for name in names:
+                    if match.group(name) is not None:
+                        counts[name] = counts.get(name, 0) + 1
+
+        metrics = _measure(text, self._metrics) if self._metrics else {}
+        fired = []
+        for rule in self.rules:
+            if "metric" in rule:
+                if metrics[rule["metric"]] > rule.get("above", 0):
+                    fired.append(rule)
+            elif counts.get(f"r{rule['index']}", 0) >= rule["min_matches"]:
+                fired.append(rule)
+        return RuleMatches(fired)
+
+    def evaluate_batch(self, texts):
+        """
+        Evaluate every rule over many texts with vectorized NumPy passes.
+        Returns a DataFrame with one row per text: the word count, each metric used by a rule,
+        the match count of each pattern/keyword rule (<id>_matches) and a
+        fired_<id> column per rule. Keyword rules and metrics never touch
+        Python-level per-text code; free-form regex rules fall back to one
+        regex scan over the joined chunk.
+        """
+        texts = list(texts)
+        chunks = [self._evaluate_chunk(texts[i:i + BATCH_CHUNK_SIZE])
+                  for i in range(0, len(texts), BATCH_CHUNK_SIZE)]
+        if not chunks:
+            return self._evaluate_chunk([])
+        return pd.concat(chunks, ignore_index=True)
+
+    def _evaluate_chunk(self, texts):
+        batch = TextBatch(texts)
+        columns = {"words": batch.word_stats()[0]}
+        fired = {}
+        for rule in self.rules:
+            if "metric" in rule:
+                name = rule["metric"]
+                if name not in columns:
+                    columns[name] = BATCH_METRICS[name](batch)
+                fired[f"fired_{rule['id']}"] = columns[name] > rule.get("above", 0)
+                continue
+            if "keywords" in rule:
+                counts = batch.phrase_counts(rule["keywords"])
+            else:
+                counts = batch.regex_counts(rule["pattern"], 0 if rule["case_sensitive"] else re.IGNORECASE)
+            columns[f"{rule['id']}_matches"] = counts
+            fired[f"fired_{rule['id']}"] = counts >= rule["min_matches"]
+        columns.update(fired)
+        return pd.DataFrame(columns, index=pd.RangeIndex(batch.size))
+
+
+_engine = None
+_engine_mtime = None
+_engine_lock = threading.Lock()
+
+
+def get_rule_engine():
+    """
+    The engine for RULES_FILE, rebuilt when the file changes. A broken edit
+    is reported and the previously loaded rules stay in force.
+    """
+    global _engine, _engine_mtime
+    try:
+        mtime = os.path.getmtime(RULES_FILE)
+    except OSError as e:
+        print(f"Rules file unavailable: {e}")
+        mtime = _engine_mtime
+    with _engine_lock:
+        if _engine is None or mtime != _engine_mtime:
+            try:
+                _engine = RuleEngine.from_file(RULES_FILE)
+            except Exception as e:
+                print(f"Rules file error: {e}")
+                if _engine is None:
+                    _engine = RuleEngine([])
+            _engine_mtime = mtime
+        return _engine
+
+
+def evaluate_rules(text):
+    """Run the configured heuristics over text."""
+    return get_rule_engine().evaluate(text)
+
+
+def style_features(texts, include_subjectivity=True):
+    """
+    Feature matrix of the local heuristics for many claims (one row each):
+    word count, the rule metrics and match counts, fired_<rule> flags and,
+    unless include_subjectivity is False, the lexicon subjectivity score.
+    """
+    texts = list(texts)
+    features = get_rule_engine().evaluate_batch(texts)
+    if include_subjectivity:
+        features["subjectivity"] = subjectivity_batch(texts)
+    return features
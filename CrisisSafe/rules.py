@@ -1,12 +1,32 @@
+import asyncio
+import copy
+import json
+import math
 import os
+import queue
 import re
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlsplit
+import httpx
 from dotenv import load_dotenv
 import streamlit as st
-from openai import OpenAI
-from newspaper import Article
-from textblob import TextBlob
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
 from duckduckgo_search import DDGS
-from archive import get_cached_analysis, store_analysis
+from archive import (
+    acquire_claim_lock, claim_lock_held, get_cached_analysis, get_claim_key,
+    get_exact_hash, get_job, release_claim_lock, store_analysis
+)
+from cache import LRUCache
+from extraction import extract_article_content, extract_article_content_async, extract_urls
+from jobs import JobWorkers
+from singleflight import AsyncSingleFlight, SingleFlight
+from subjectivity import subjectivity
+from ruleengine import evaluate_rules
+from scheduler import PRIORITY_HIGHLIGHT, PRIORITY_VERDICT, get_scheduler
+from scriptfilter import DEFAULT_BLOCKED_SCRIPTS, ScriptFilter
 
 # ==================== SETUP ====================
 
@@ -30,73 +50,232 @@ def get_api_key():
         
     return None
 
-# Client is initialized lazily to ensure it picks up fresh env vars or secrets
+MODELS_BASE_URL = "https://models.github.ai/inference"
+
+# Connection pool shared by every call through the process-wide client
+CLIENT_MAX_CONNECTIONS = int(os.getenv("CRISISSAFE_CLIENT_MAX_CONNECTIONS", "20"))
+CLIENT_MAX_KEEPALIVE = int(os.getenv("CRISISSAFE_CLIENT_MAX_KEEPALIVE", "10"))
+CLIENT_KEEPALIVE_EXPIRY = float(os.getenv("CRISISSAFE_CLIENT_KEEPALIVE_EXPIRY", "60"))
+
+_client_lock = threading.Lock()
+_client = None
+_client_key = None
+# One async client per event loop: its connections cannot be shared across loops
+_async_clients = weakref.WeakKeyDictionary()
+
+def _pool_limits():
+    return httpx.Limits(
+        max_connections=CLIENT_MAX_CONNECTIONS,
+        max_keepalive_connections=CLIENT_MAX_KEEPALIVE,
+        keepalive_expiry=CLIENT_KEEPALIVE_EXPIRY
+    )
+
+# Client is initialized lazily to ensure it picks up fresh env vars or secrets.
+# It is then reused process-wide (keep-alive connections, one TLS handshake)
+# and only rebuilt when the API key changes.
 def get_client():
+    global _client, _client_key
     key = get_api_key()
     if not key:
         print("⚠️ API Key missing in get_client()")
         return None
-    return OpenAI(
-        base_url="https://models.github.ai/inference",
-        api_key=key
-    )
+    with _client_lock:
+        if _client is None or key != _client_key:
+            _client = OpenAI(
+                base_url=MODELS_BASE_URL,
+                api_key=key,
+                http_client=DefaultHttpxClient(limits=_pool_limits()),
+                max_retries=0  # Retries go through the shared scheduler
+            )
+            _client_key = key
+        return _client
 
 MODEL_NAME = "gpt-4o-mini"
 
-# ==================== HELPERS ====================
+# Related-article highlighting runs one LLM call per snippet in parallel
+HIGHLIGHT_TIMEOUT = float(os.getenv("CRISISSAFE_HIGHLIGHT_TIMEOUT", "10"))
+_highlight_executor = ThreadPoolExecutor(max_workers=6, thread_name_prefix="highlight")
 
-def extract_article_content(url):
-    """Extract text content from a URL using newspaper3k."""
-    try:
-        article = Article(url, language='en')
-        article.download()
-        article.parse()
-        return article.text
-    except Exception as e:
-        print(f"Article extraction error: {e}")
-        return None
+# Raw DDGS hits are cached per query; failed or empty searches are cached
+# briefly so a flaky backend is not hammered. Highlighted snippets depend on
+# the verdict and are cached per (query, verdict, url).
+SEARCH_CACHE_TTL = float(os.getenv("CRISISSAFE_SEARCH_CACHE_TTL", str(6 * 3600)))
+SEARCH_NEGATIVE_TTL = float(os.getenv("CRISISSAFE_SEARCH_NEGATIVE_TTL", "300"))
+SEARCH_CACHE_SIZE = int(os.getenv("CRISISSAFE_SEARCH_CACHE_SIZE", "1024"))
+_search_cache = LRUCache(SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)
+_highlight_cache = LRUCache(SEARCH_CACHE_SIZE * 3, ttl=SEARCH_CACHE_TTL)
 
+# Related articles shown per claim, and the most hits ever requested for them.
+# The request size adapts to the observed share of hits the filter keeps.
+SEARCH_RESULTS = 3
+SEARCH_MAX_FETCH = int(os.getenv("CRISISSAFE_SEARCH_MAX_FETCH", "10"))
+SEARCH_BLOCKED_SCRIPTS = [
+    name.strip() for name in
+    os.getenv("CRISISSAFE_SEARCH_BLOCKED_SCRIPTS", ",".join(DEFAULT_BLOCKED_SCRIPTS)).split(",")
+    if name.strip()
+]
+_search_filter = ScriptFilter(SEARCH_BLOCKED_SCRIPTS)
+_search_stats = {"searches": 0, "fetched": 0, "scanned": 0, "kept": 0, "short": 0, "discarded": {}}
+_search_stats_lock = threading.Lock()
+
+# ==================== HELPERS ====================
 
 def find_related_articles(query, verdict="UNCERTAIN"):
     """Search for related articles and highlight relevant text."""
+    return highlight_results(query, search_related_articles(query), verdict)
+
+
+def _search_key(query):
+    return " ".join(query[:200].lower().split())
+
+
+def set_search_filter(search_filter):
+    """
+    Replace the hit filter: a callable taking the title + body of a hit and
+    returning a discard reason, or None to keep it (see scriptfilter.ScriptFilter).
+    """
+    global _search_filter
+    _search_filter = search_filter
+
+
+def _search_fetch_size():
+    """Hits to request so that SEARCH_RESULTS usually survive the filter."""
+    with _search_stats_lock:
+        scanned, kept = _search_stats["scanned"], _search_stats["kept"]
+    if scanned < 30:
+        return SEARCH_MAX_FETCH
+    keep_ratio = max(kept / scanned, 0.1)
+    # 50% headroom: a short list costs more than a few extra hits
+    return min(SEARCH_MAX_FETCH, max(SEARCH_RESULTS, math.ceil(SEARCH_RESULTS / keep_ratio * 1.5)))
+
+
+def _record_search(fetched, scanned, kept, discarded):
+    with _search_stats_lock:
+        _search_stats["searches"] += 1
+        _search_stats["fetched"] += fetched
+        _search_stats["scanned"] += scanned
+        _search_stats["kept"] += kept
+        _search_stats["short"] += kept < SEARCH_RESULTS
+        for reason, count in discarded.items():
+            _search_stats["discarded"][reason] = _search_stats["discarded"].get(reason, 0) + count
+
+
+def get_search_stats():
+    """
+    Over-fetch counters: hits fetched vs. scanned vs. kept, discards per
+    reason, and searches that came back with fewer than SEARCH_RESULTS.
+    """
+    with _search_stats_lock:
+        stats = dict(_search_stats, discarded=dict(_search_stats["discarded"]))
+    stats["keep_ratio"] = stats["kept"] / stats["scanned"] if stats["scanned"] else None
+    stats["next_fetch_size"] = _search_fetch_size()
+    return stats
+
+
+def search_related_articles(query):
+    """
+    Search for related articles; returns up to 3 English hits without highlighting.
+    Hits come from the query cache when possible; callers get fresh dicts
+    they are free to annotate. Hits are consumed lazily and scanning stops
+    as soon as enough have passed the script filter.
+    """
+    key = _search_key(query)
+    cached = _search_cache.get(key)
+    if cached is not None:
+        return [dict(r) for r in cached]
+    
     results = []
+    failed = False
+    fetched = scanned = 0
+    discarded = {}
     try:
         search_query = query[:200] + " english"
         with DDGS() as ddgs:
             # Request US-English results
-            search_results = ddgs.text(search_query, region="us-en", max_results=10, backend="lite")
+            search_results = ddgs.text(search_query, region="us-en", max_results=_search_fetch_size(), backend="lite")
             
             if search_results:
-                count = 0
+                # Backends that return a list are counted up front; generators as consumed
+                fetched = len(search_results) if hasattr(search_results, "__len__") else 0
                 for r in search_results:
-                    if count >= 3:
+                    if len(results) >= SEARCH_RESULTS:
                         break
-                        
-                    # strict filtering: check for common CJK unicode ranges
-                    content_to_check = r.get("title", "") + r.get("body", "")
-                    if re.search(r'[\u4e00-\u9fff]', content_to_check):
+                    scanned += 1
+                    
+                    # strict filtering: drop hits written in a blocked script
+                    reason = _search_filter(r.get("title", "") + r.get("body", ""))
+                    if reason:
+                        discarded[reason] = discarded.get(reason, 0) + 1
                         continue
                         
                     results.append({
                         "title": r.get("title", ""),
                         "url": r.get("href", ""),
-                        "body": r.get("body", ""),
-                        "highlighted_body": highlight_with_ai(query, r.get("body", ""), verdict)
+                        "body": r.get("body", "")
                     })
-                    count += 1
+                fetched = fetched or scanned
     except Exception as e:
         print(f"Search error: {e}")
+        failed = True
+    
+    if not failed:
+        _record_search(fetched, scanned, len(results), discarded)
     
+    _search_cache.set(key, [dict(r) for r in results],
+                      ttl=SEARCH_NEGATIVE_TTL if failed or not results else None)
     return results
 
 
-def highlight_with_ai(claim, snippet, verdict="UNCERTAIN"):
+def _cached_highlight(query, verdict, r):
+    """Highlighted body for a hit from an earlier request, or None."""
+    cached = _highlight_cache.get((_search_key(query), verdict, r.get("url")))
+    if cached is not None and cached[0] == r["body"]:
+        return cached[1]
+    return None
+
+
+def _store_highlight(query, verdict, r, highlighted):
+    if r.get("url"):
+        _highlight_cache.set((_search_key(query), verdict, r["url"]), (r["body"], highlighted))
+
+
+def get_search_cache_stats():
+    """Hit/miss counters of the search and highlight caches."""
+    return {"search": _search_cache.stats(), "highlight": _highlight_cache.stats()}
+
+
+def highlight_results(query, results, verdict="UNCERTAIN", timeout=None):
     """
-    Uses AI to semantically highlight the most relevant sentence using the shared OpenAI client.
+    Fill in "highlighted_body" for each result, running the highlight calls
+    concurrently. Any call not finished within timeout keeps the plain snippet
+    and is cancelled, or stops waiting for the rate limit if already running,
+    so it does not spend the shared budget after the caller has moved on.
     """
-    if not snippet or len(snippet) < 10:
-        return snippet
-    
+    deadline = time.monotonic() + (HIGHLIGHT_TIMEOUT if timeout is None else timeout)
+    futures = []
+    for r in results:
+        cached = _cached_highlight(query, verdict, r)
+        if cached is None:
+            futures.append(_highlight_executor.submit(
+                highlight_with_ai, query, r["body"], verdict, r.get("url"), deadline
+            ))
+        else:
+            futures.append(None)
+            r["highlighted_body"] = cached
+    for r, future in zip(results, futures):
+        if future is None:
+            continue
+        try:
+            r["highlighted_body"] = future.result(timeout=max(0, deadline - time.monotonic()))
+        except Exception as e:
+            future.cancel()
+            print(f"Highlighting skipped: {e!r}")
+            r["highlighted_body"] = r["body"]
+    return results
+
+
+def _highlight_messages(claim, snippet, verdict):
+    """Chat messages asking the model to mark the sentence that best fits the verdict."""
     # Adjust prompt based on verdict
     if verdict == "TRUE":
         goal = "identify the sentence that CONFIRMS the claim is TRUE"
@@ -105,42 +284,61 @@ def highlight_with_ai(claim, snippet, verdict="UNCERTAIN"):
     else:
         goal = "identify the SINGLE most relevant sentence"
     
+    return [
+        {
+            "role": "system",
+            "content": f"You are a text highlighter. Your goal is to {goal} in the provided text. Return the full text, but wrap that ONE sentence in <mark> tags. Do not change any other text. If no sentence is relevant/aligned with the verdict, return the text unchanged."
+        },
+        {
+            "role": "user",
+            "content": f"CLAIM: {claim}\nTEXT: {snippet}"
+        }
+    ]
+
+
+def _style_highlight(snippet, highlighted_text):
+    """Validate the model's output and turn <mark> tags into styled spans."""
+    # Safety check: validate output length
+    if abs(len(highlighted_text) - len(snippet)) > 100:
+         return snippet
+         
+    # Convert <mark> to styled span
+    style = "background-color: #fff2cc; border-bottom: 2px solid #e6b800; font-weight: bold; color: #2d241a;"
+    return highlighted_text.replace(
+        "<mark>", 
+        f"<span style='{style}'>"
+    ).replace("</mark>", "</span>")
+
+
+def highlight_with_ai(claim, snippet, verdict="UNCERTAIN", url=None, deadline=None):
+    """
+    Uses AI to semantically highlight the most relevant sentence using the shared OpenAI client.
+    Successful highlights are cached under (claim, verdict, url) when url is given.
+    deadline (time.monotonic()) bounds the wait for the rate limit; it
+    defaults to HIGHLIGHT_TIMEOUT from now.
+    """
+    if not snippet or len(snippet) < 10:
+        return snippet
+    
     # Init client
     client = get_client()
     if not client:
         return snippet
 
     try:
-        response = client.chat.completions.create(
+        response = get_scheduler().call(
+            MODEL_NAME, PRIORITY_HIGHLIGHT, client.chat.completions.create,
             model=MODEL_NAME,
-            messages=[
-                {
-                    "role": "system",
-                    "content": f"You are a text highlighter. Your goal is to {goal} in the provided text. Return the full text, but wrap that ONE sentence in <mark> tags. Do not change any other text. If no sentence is relevant/aligned with the verdict, return the text unchanged."
-                },
-                {
-                    "role": "user",
-                    "content": f"CLAIM: {claim}\nTEXT: {snippet}"
-                }
-            ],
+            messages=_highlight_messages(claim, snippet, verdict),
             temperature=0.1,
-            max_tokens=300
+            max_tokens=300,
+            timeout=HIGHLIGHT_TIMEOUT,
+            deadline=deadline if deadline is not None else time.monotonic() + HIGHLIGHT_TIMEOUT
         )
         
-        highlighted_text = response.choices[0].message.content.strip()
-        
-        # Safety check: validate output length
-        if abs(len(highlighted_text) - len(snippet)) > 100:
-             return snippet
-             
-        # Convert <mark> to styled span
-        style = "background-color: #fff2cc; border-bottom: 2px solid #e6b800; font-weight: bold; color: #2d241a;"
-        highlighted_text = highlighted_text.replace(
-            "<mark>", 
-            f"<span style='{style}'>"
-        ).replace("</mark>", "</span>")
-        
-        return highlighted_text
+        highlighted = _style_highlight(snippet, response.choices[0].message.content.strip())
+        _store_highlight(claim, verdict, {"url": url, "body": snippet}, highlighted)
+        return highlighted
 
     except Exception as e:
         print(f"Highlighting error: {e}")
@@ -149,149 +347,176 @@ def highlight_with_ai(claim, snippet, verdict="UNCERTAIN"):
 
 # ==================== CORE ANALYSIS ====================
 
-def analyze_content(text):
+# Whole-request budget for the concurrent analysis pipeline
+ANALYSIS_DEADLINE = float(os.getenv("CRISISSAFE_ANALYSIS_DEADLINE", "60"))
+# Characters of article text given to the verdict step, split across links
+ARTICLE_CONTEXT_CHARS = 1500
+_pipeline_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="pipeline")
+
+# Identical claims verified concurrently share one pipeline run
+CROSS_PROCESS_COALESCING = os.getenv("CRISISSAFE_CROSS_PROCESS_COALESCING", "1") != "0"
+COALESCE_POLL_INTERVAL = 0.25
+_inflight = SingleFlight()
+_inflight_async = AsyncSingleFlight()
+
+# "full" runs every check; "triage" answers from the local rules and the
+# archive only and queues the full verification in the background
+ANALYSIS_MODES = ("full", "triage")
+ANALYSIS_MODE = os.getenv("CRISISSAFE_ANALYSIS_MODE", "full")
+# Provisional scores never read as VERIFIED: the local rules can only lower them
+PROVISIONAL_SCORE_CAP = 80
+
+# Field names of the analyze_content tuple, as stored on finished jobs
+RESULT_FIELDS = (
+    "score", "flags", "ai_report", "is_subjective", "is_from_archive",
+    "checklist", "related_articles", "pointers"
+)
+
+VERDICT_SYSTEM_PROMPT = "You are a strict logical fact-checker. You must determine if the CLAIM is Factually Accurate.\n- If the claim contradicts established facts (e.g., 'Sun is not a star'), return FALSE.\n- Pay close attention to negations ('not', 'no', 'never').\n- Classify strictly as TRUE, FALSE, or UNCERTAIN.\n\nReply ONLY in this format:\nVERDICT: <TRUE/FALSE/UNCERTAIN>\nEXPLANATION: <one short sentence>\nPOINTERS: <If the claim is debatable, subjective, or nuanced (Verdict UNCERTAIN), provide 3 short, neutral bullet points for critical thinking to help the user form their own opinion. If the claim is a simple objective FACT (TRUE/FALSE), leave this section empty.>"
+
+def _remaining(deadline):
+    return max(0.0, deadline - time.monotonic())
+
+def _wait(future, deadline, default=None):
+    """Result of a pipeline step, or default if it failed or ran past the deadline."""
+    if future is None:
+        return default
+    try:
+        return future.result(timeout=_remaining(deadline))
+    except Exception as e:
+        print(f"Pipeline step skipped: {e!r}")
+        return default
+
+def _verdict_from_score(score):
+    if score > 80:
+        return "TRUE"
+    if score < 40:
+        return "FALSE"
+    return "UNCERTAIN"
+
+def _style_checks(text):
+    """Local subjectivity score plus the configured rules (see rules.json)."""
+    return subjectivity(text), evaluate_rules(text)
+
+def _parse_ai_verdict(ai_text):
     """
-    Analyzes text for credibility using multiple checks.
+    Split a fact-check reply into (ai_report, verdict, pointers, status).
+    status is True/False for a definite verdict, "uncertain" or None.
     """
+    pointers = []
+    verdict = "UNCERTAIN"
+    ai_verification_status = None
     
-    # ---------- 0. CHECK ARCHIVE FIRST ----------
-    # We need client for cache check if we pass it, but archive logic might use it differently
-    client = get_client()
+    # Extract pointers
+    if "POINTERS:" in ai_text:
+        parts = ai_text.split("POINTERS:")
+        ai_report = parts[0].strip()
+        pointers_text = parts[1].strip()
+        for line in pointers_text.split('\n'):
+            line = line.strip()
+            if line.startswith('-'):
+                pointers.append(line[1:].strip())
+    else:
+        ai_report = ai_text
     
-    cached_result, is_cached = get_cached_analysis(text, client)
-    if is_cached:
-        checklist = cached_result.get("checklist", {})
-        related = cached_result.get("related_articles", [])
-        
-        if not related:
-            try:
-                verdict = "UNCERTAIN"
-                if cached_result["score"] > 80:
-                    verdict = "TRUE"
-                elif cached_result["score"] < 40:
-                    verdict = "FALSE"
-                
-                related = find_related_articles(text, verdict)
-            except Exception:
-                related = []
-        
-        pointers = cached_result.get("pointers", [])
-        return (
-            cached_result["score"],
-            cached_result["flags"],
-            cached_result["ai_report"],
-            cached_result["is_subjective"],
-            True,
-            checklist,
-            related,
-            pointers
-        )
+    # Extract verdict
+    verdict_match = re.search(r'VERDICT:\s*(TRUE|FALSE|UNCERTAIN)', ai_text, re.IGNORECASE)
+    if verdict_match:
+        verdict = verdict_match.group(1).upper()
+        if verdict == "TRUE":
+            ai_verification_status = True
+            pointers = []
+        elif verdict == "FALSE":
+            ai_verification_status = False
+            pointers = []
+        else:
+            ai_verification_status = "uncertain"
     
+    return ai_report, verdict, pointers, ai_verification_status
+
+def _verdict_messages(context_text):
+    """Chat messages for the single-claim fact-check."""
+    return [
+        {
+            "role": "system",
+            "content": VERDICT_SYSTEM_PROMPT
+        },
+        {
+            "role": "user",
+            "content": f"CLAIM:\n{context_text}"
+        }
+    ]
+
+def _claim_context(text, articles):
+    """
+    Text handed to the fact-checker: the extracted article bodies when there
+    are any, sharing one ARTICLE_CONTEXT_CHARS budget between them.
+    """
+    extracted = [(url, body) for url, body in articles.items() if body]
+    if not extracted:
+        return text
+    share = ARTICLE_CONTEXT_CHARS // len(extracted)
+    return "\n\n".join(f"URL: {url}\nArticle Content: {body[:share]}" for url, body in extracted)
+
+def _assemble_analysis(text, style, articles, ai_text, ai_error, provisional=False):
+    """
+    Score a claim from the outputs of every pipeline step.
+    style is the _style_checks pair, articles maps each link in the text to
+    its extracted body (or None), and exactly one of ai_text / ai_error is set.
+    With provisional=True the AI step has not run yet: it is marked pending
+    and the score comes from the local checks alone.
+    Returns (analysis_result, verdict); related_articles is left empty.
+    """
     # Initialize
     score = 100
     flags = []
-    context_text = text
     checklist = {}
     pointers = []
     
     # ---------- 1. SUBJECTIVITY CHECK ----------
-    blob = TextBlob(text)
-    subj_score = blob.sentiment.subjectivity
+    subj_score, rule_matches = style
     is_subjective = subj_score > 0.5
     
-    has_panic_pattern = bool(re.search(r'!!+|\?\?+', text))
-    has_shouting = len(re.findall(r'\b[A-Z]{4,}\b', text)) >= 3
-    
-    text_words = text.split()
-    if text_words:
-        uppercase_ratio = sum(1 for word in text_words if word.isupper() and len(word) > 1) / len(text_words)
-        has_excessive_caps = uppercase_ratio > 0.5
-    else:
-        has_excessive_caps = False
-    
-    is_objective = not (is_subjective or has_panic_pattern or has_shouting or has_excessive_caps)
+    is_objective = not (is_subjective or rule_matches.ids("style"))
     checklist["objective_language"] = is_objective
     
     if is_subjective:
         flags.append(f"🧠 Subjective language detected (Score: {subj_score:.2f}).")
     
     # ---------- 2. URL EXTRACTION ----------
-    url_match = re.search(r'(https?://\S+)', text)
-    url_extracted = False
-    if url_match:
-        url = url_match.group(1)
-        article_text = extract_article_content(url)
-        if article_text:
-            context_text = f"URL: {url}\nArticle Content: {article_text[:1500]}"
+    extracted_count = sum(1 for body in articles.values() if body)
+    if len(articles) == 1:
+        if extracted_count:
             flags.append("ℹ️ Extracted article content from URL.")
-            url_extracted = True
         else:
             flags.append("⚠️ Could not extract article content from URL.")
+    elif articles:
+        flags.append(f"ℹ️ Extracted article content from {extracted_count} of {len(articles)} URLs.")
+        for url, body in articles.items():
+            if not body:
+                flags.append(f"⚠️ Could not extract article content from {urlsplit(url).netloc}.")
     
-    checklist["url_extraction"] = url_extracted if url_match else None
+    checklist["url_extraction"] = extracted_count > 0 if articles else None
+    if len(articles) > 1:
+        for n, body in enumerate(articles.values(), 1):
+            checklist[f"url_extraction_{n}"] = bool(body)
     
     # ---------- 3. PANIC / STYLE RULES ----------
-    checklist["no_panic_pattern"] = not has_panic_pattern
-    if has_panic_pattern:
-        score -= 25
-        flags.append("⚠️ Panic Pattern: Excessive punctuation detected.")
-    
-    checklist["no_shouting"] = not (has_shouting or has_excessive_caps)
-    if has_shouting or has_excessive_caps:
-        score -= 20
-        flags.append("⚠️ Shouting Pattern: Excessive uppercase usage detected.")
+    checklist["no_panic_pattern"] = rule_matches.passed("no_panic_pattern")
+    checklist["no_shouting"] = rule_matches.passed("no_shouting")
+    score = rule_matches.apply("style", score, flags)
     
     # ---------- 4. AI FACT VERIFICATION ----------
     ai_report = "AI verification unavailable."
     verdict = "UNCERTAIN"
     ai_verification_status = None
     
-    try:
-        if not client:
-             raise ValueError("OpenAI Client failed to initialize (Missing Key).")
-
-        response = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a strict logical fact-checker. You must determine if the CLAIM is Factually Accurate.\n- If the claim contradicts established facts (e.g., 'Sun is not a star'), return FALSE.\n- Pay close attention to negations ('not', 'no', 'never').\n- Classify strictly as TRUE, FALSE, or UNCERTAIN.\n\nReply ONLY in this format:\nVERDICT: <TRUE/FALSE/UNCERTAIN>\nEXPLANATION: <one short sentence>\nPOINTERS: <If the claim is debatable, subjective, or nuanced (Verdict UNCERTAIN), provide 3 short, neutral bullet points for critical thinking to help the user form their own opinion. If the claim is a simple objective FACT (TRUE/FALSE), leave this section empty.>"
-                },
-                {
-                    "role": "user",
-                    "content": f"CLAIM:\n{context_text}"
-                }
-            ],
-            max_tokens=250,
-            temperature=0.1
-        )
-        
-        ai_text = response.choices[0].message.content.strip()
-        
-        # Extract pointers
-        if "POINTERS:" in ai_text:
-            parts = ai_text.split("POINTERS:")
-            ai_report = parts[0].strip()
-            pointers_text = parts[1].strip()
-            for line in pointers_text.split('\n'):
-                line = line.strip()
-                if line.startswith('-'):
-                    pointers.append(line[1:].strip())
-        else:
-            ai_report = ai_text
-        
-        # Extract verdict
-        verdict_match = re.search(r'VERDICT:\s*(TRUE|FALSE|UNCERTAIN)', ai_text, re.IGNORECASE)
-        if verdict_match:
-            verdict = verdict_match.group(1).upper()
-            if verdict == "TRUE":
-                ai_verification_status = True
-                pointers = []
-            elif verdict == "FALSE":
-                ai_verification_status = False
-                pointers = []
-            else:
-                ai_verification_status = "uncertain"
+    if provisional:
+        ai_report = "AI verification is queued; this is a provisional result from local checks."
+        ai_verification_status = "pending"
+        flags.append("⏳ Provisional: scored by local checks only, full verification is queued.")
+    elif ai_error is None:
+        ai_report, verdict, pointers, ai_verification_status = _parse_ai_verdict(ai_text)
         
         # Apply penalties
         if verdict == "FALSE":
@@ -300,9 +525,8 @@ def analyze_content(text):
         elif verdict == "UNCERTAIN":
             score -= 25
             flags.append("⚠️ AI Verdict: Claim cannot be verified confidently.")
-    
-    except Exception as e:
-        error_msg = str(e)
+    else:
+        error_msg = str(ai_error)
         flags.append(f"⚠️ AI verification unavailable: {error_msg[:100]}")
         ai_report = f"AI verification failed: {error_msg}"
         score -= 30
@@ -310,63 +534,607 @@ def analyze_content(text):
     checklist["ai_verification"] = ai_verification_status
     
     # ---------- 5. SANITY CHECKS ----------
-    has_false_claim = "india is not a country" in text.lower()
-    
-    false_claim_patterns = [
-        r'\b(will kill everyone|kill everyone|everyone will die|everyone dies)\b',
-        r'\b(end the world|world will end|end of the world|world ends)\b',
-        r'\b(everyone is going to die|everyone dies|all will die)\b',
-        r'\b(100% fatal|100% death rate)\b'
-    ]
-    
-    has_exaggerated_claim = any(re.search(pattern, text.lower()) for pattern in false_claim_patterns)
-    
-    sanity_check_passed = not (has_false_claim or has_exaggerated_claim or ai_verification_status is False)
+    sanity_check_passed = rule_matches.passed("sanity_check") and ai_verification_status is not False
     checklist["sanity_check"] = sanity_check_passed
-    
-    if has_false_claim:
-        score = min(score, 20)
-        flags.append("❌ Deterministic Check: India is a sovereign country.")
-    elif has_exaggerated_claim:
-        score = min(score, 30)
-        flags.append("❌ Sanity Check: Detected obviously false or exaggerated claim.")
+    score = rule_matches.apply("sanity", score, flags)
     
     # ---------- FINAL SCORE ----------
     score = min(max(score, 0), 100)
+    if provisional:
+        score = min(score, PROVISIONAL_SCORE_CAP)
+        checklist["provisional"] = True
+        verdict = _verdict_from_score(score)
     
-    # ---------- 6. FIND RELATED ARTICLES ----------
-    related_articles = find_related_articles(text, verdict)
-    
-    # ---------- 7. STORE IN ARCHIVE ----------
     analysis_result = {
         "score": score,
         "flags": flags,
         "ai_report": ai_report,
         "is_subjective": is_subjective,
         "checklist": checklist,
-        "related_articles": related_articles,
+        "related_articles": [],
         "pointers": pointers
     }
-    store_analysis(text, analysis_result, client)
-    
+    return analysis_result, verdict
+
+def _result_tuple(result, is_from_archive, related):
+    """The tuple analyze_content returns, built from an analysis dict."""
     return (
-        score,
-        flags,
-        ai_report,
-        is_subjective,
-        False,
-        checklist,
-        related_articles,
-        pointers
+        result["score"],
+        result["flags"],
+        result["ai_report"],
+        result["is_subjective"],
+        is_from_archive,
+        result.get("checklist", {}),
+        related,
+        result.get("pointers", [])
+    )
+
+def _check_mode(mode):
+    mode = mode or ANALYSIS_MODE
+    if mode not in ANALYSIS_MODES:
+        raise ValueError(f"Unknown analysis mode {mode!r}; expected one of {', '.join(ANALYSIS_MODES)}")
+    return mode
+
+def analyze_content(text, mode=None):
+    """
+    Analyzes text for credibility using multiple checks.
+    Concurrent calls for the same claim text share one computation: threads
+    in this process wait on the in-flight call, and other processes wait on
+    a lock in CLAIM_LOCK_DB until the result has been stored.
+    mode="triage" returns at once from the local rules and the archive (see
+    triage_content); the default comes from CRISISSAFE_ANALYSIS_MODE.
+    """
+    if _check_mode(mode) == "triage":
+        return triage_content(text)
+    lock_key = get_exact_hash(text)
+    result, shared = _inflight.do(lock_key, _analyze_content_locked, text, lock_key)
+    # Followers get their own copy so callers cannot mutate each other's results
+    return copy.deepcopy(result) if shared else result
+
+def _analyze_content_locked(text, lock_key):
+    """Run the analysis while holding the cross-process lock for this claim."""
+    if not CROSS_PROCESS_COALESCING:
+        return _analyze_content_once(text)
+    
+    owner = f"{os.getpid()}:{threading.get_ident()}:{time.monotonic()}"
+    owned = acquire_claim_lock(lock_key, owner, ANALYSIS_DEADLINE + 30)
+    if not owned:
+        # Another process is verifying this claim; wait for it to land in the archive
+        deadline = time.monotonic() + ANALYSIS_DEADLINE
+        while time.monotonic() < deadline and claim_lock_held(lock_key):
+            if get_cached_analysis(text, local_only=True)[1]:
+                break
+            time.sleep(COALESCE_POLL_INTERVAL)
+    try:
+        # Either an archive hit now, or the work was never finished elsewhere
+        return _analyze_content_once(text)
+    finally:
+        if owned:
+            release_claim_lock(lock_key, owner)
+
+def _analyze_content_once(text):
+    """
+    A single, uncoalesced analysis.
+    Network steps run as a concurrent pipeline: the related-article search
+    and URL extraction start as soon as the archive misses, the verdict
+    waits only on extraction, and highlighting waits on the verdict. All
+    waits share one per-request deadline.
+    """
+    deadline = time.monotonic() + ANALYSIS_DEADLINE
+    
+    # ---------- 0. CHECK ARCHIVE FIRST ----------
+    # We need client for cache check if we pass it, but archive logic might use it differently
+    client = get_client()
+    # Normalize once; the same key is reused when storing the result
+    claim_key = get_claim_key(text, client)
+    
+    search_future = None
+    urls = extract_urls(text)
+    extraction_futures = {}
+    
+    # The local key answers repeat claims without any network call
+    cached_result, is_cached = get_cached_analysis(text, client, claim_key=claim_key, local_only=True)
+    if not is_cached:
+        # Start the slow independent steps while the AI-normalized lookup runs
+        search_future = _pipeline_executor.submit(search_related_articles, text)
+        for url in urls:
+            extraction_futures[url] = _pipeline_executor.submit(extract_article_content, url)
+        cached_result, is_cached = get_cached_analysis(text, client, claim_key=claim_key)
+    
+    if is_cached:
+        for future in extraction_futures.values():
+            future.cancel()
+        related = cached_result.get("related_articles", [])
+        
+        if not related:
+            try:
+                verdict = _verdict_from_score(cached_result["score"])
+                if search_future is None:
+                    related = find_related_articles(text, verdict)
+                else:
+                    related = highlight_results(text, _wait(search_future, deadline, []), verdict,
+                                                timeout=_remaining(deadline))
+            except Exception:
+                related = []
+        
+        return _result_tuple(cached_result, True, related)
+    
+    # ---------- 1-3. LOCAL CHECKS AND URL EXTRACTION ----------
+    style = _style_checks(text)
+    # Links download in parallel on the pooled client; every wait shares the deadline
+    articles = {url: _wait(future, deadline) for url, future in extraction_futures.items()}
+    context_text = _claim_context(text, articles)
+    
+    # ---------- 4. AI FACT VERIFICATION ----------
+    ai_text, ai_error = fact_check(client, context_text, max(1.0, _remaining(deadline)))
+    
+    # ---------- 5. SANITY CHECKS AND FINAL SCORE ----------
+    analysis_result, verdict = _assemble_analysis(text, style, articles, ai_text, ai_error)
+    
+    # ---------- 6. FIND RELATED ARTICLES ----------
+    # The search has been running since the archive miss; only highlighting depends on the verdict
+    related_articles = highlight_results(text, _wait(search_future, deadline, []), verdict,
+                                         timeout=_remaining(deadline))
+    analysis_result["related_articles"] = related_articles
+    
+    # ---------- 7. STORE IN ARCHIVE ----------
+    store_analysis(text, analysis_result, client, claim_key=claim_key)
+    
+    return _result_tuple(analysis_result, False, related_articles)
+
+# ==================== TRIAGE AND BACKGROUND JOBS ====================
+
+def triage_content(text, schedule=True):
+    """
+    Rule-only analysis that makes no network calls.
+    An archived verdict (local key only) is returned as usual; otherwise the
+    score comes from the local rules and subjectivity check, the checklist
+    carries provisional=True and, unless schedule is False, the full
+    verification is queued as a background job (submit_verification).
+    Once it lands in the archive the next call for the claim returns it.
+    """
+    cached_result, is_cached = get_cached_analysis(text, local_only=True)
+    if is_cached:
+        return _result_tuple(cached_result, True, cached_result.get("related_articles", []))
+    
+    analysis_result, _ = _assemble_analysis(text, _style_checks(text), {}, None, None, provisional=True)
+    if schedule:
+        submit_verification(text)
+    return _result_tuple(analysis_result, False, [])
+
+def _verification_job(text):
+    return dict(zip(RESULT_FIELDS, analyze_content(text, mode="full")))
+
+_job_workers = JobWorkers(_verification_job)
+
+def submit_verification(text):
+    """
+    Queue a full analysis of text as a background job and return its id
+    (see get_verification). The result is stored in the archive as well as
+    on the job. A claim that is already queued or running shares its job;
+    None means the job table is unusable.
+    """
+    return _job_workers.submit(text, get_exact_hash(text))
+
+def get_verification(job_id):
+    """
+    The job as a dict with status "queued", "running", "done" or "failed";
+    once done, result maps RESULT_FIELDS to the analyze_content values.
+    """
+    return get_job(job_id)
+
+def pending_verifications():
+    """Number of jobs submitted from this process that are not finished."""
+    return _job_workers.pending()
+
+def wait_for_verifications(timeout=None):
+    """
+    Block until the jobs submitted from this process have finished (or
+    timeout passes). Short-lived CLI processes call this before exiting;
+    unfinished jobs would otherwise wait for the next worker process.
+    """
+    return _job_workers.wait(timeout)
+
+
+# ==================== BATCHED FACT-CHECKING ====================
+
+# Claims packed into one verdict request when batching is enabled (1 = off)
+VERDICT_BATCH_SIZE = int(os.getenv("CRISISSAFE_VERDICT_BATCH_SIZE", "1"))
+# How long the batcher waits for more claims before sending a partial pack
+VERDICT_BATCH_WAIT = float(os.getenv("CRISISSAFE_VERDICT_BATCH_WAIT", "0.05"))
+VERDICT_BATCH_TIMEOUT = 60
+
+BATCH_VERDICT_SYSTEM_PROMPT = "You are a strict logical fact-checker. You will receive several numbered CLAIMS. For EACH claim, determine if it is Factually Accurate.\n- If a claim contradicts established facts (e.g., 'Sun is not a star'), its verdict is FALSE.\n- Pay close attention to negations ('not', 'no', 'never').\n- Classify strictly as TRUE, FALSE, or UNCERTAIN.\n- Judge every claim independently.\n\nReply ONLY with a JSON array containing one object per claim:\n[{\"id\": <claim number>, \"verdict\": \"TRUE|FALSE|UNCERTAIN\", \"explanation\": \"<one short sentence>\", \"pointers\": [<If the verdict is UNCERTAIN, 3 short, neutral critical-thinking points; otherwise empty>]}]"
+
+_VERDICTS = ("TRUE", "FALSE", "UNCERTAIN")
+
+def _fact_check_single(client, context_text, timeout):
+    """Run the single-claim verdict prompt; returns (ai_text, ai_error)."""
+    try:
+        if not client:
+             raise ValueError("OpenAI Client failed to initialize (Missing Key).")
+
+        response = get_scheduler().call(
+            MODEL_NAME, PRIORITY_VERDICT, client.chat.completions.create,
+            model=MODEL_NAME,
+            messages=_verdict_messages(context_text),
+            max_tokens=250,
+            temperature=0.1,
+            timeout=timeout,
+            deadline=time.monotonic() + timeout
+        )
+        return response.choices[0].message.content.strip(), None
+    except Exception as e:
+        return None, e
+
+def _batch_item_text(item):
+    """
+    Render one JSON item of a batched reply in the single-claim reply format,
+    or return None if it is malformed.
+    """
+    if not isinstance(item, dict):
+        return None
+    verdict = str(item.get("verdict", "")).strip().upper()
+    explanation = item.get("explanation")
+    if verdict not in _VERDICTS or not isinstance(explanation, str) or not explanation.strip():
+        return None
+    pointers = item.get("pointers") or []
+    if not isinstance(pointers, list):
+        pointers = []
+    lines = [f"VERDICT: {verdict}", f"EXPLANATION: {explanation.strip()}", "POINTERS:"]
+    lines += [f"- {str(p).strip()}" for p in pointers if str(p).strip()]
+    return "\n".join(lines)
+
+_JSON_DECODER = json.JSONDecoder()
+
+def _nested_items(value):
+    """Objects with a verdict key inside a decoded JSON value, depth first."""
+    if isinstance(value, dict):
+        if "verdict" in value:
+            return [value]
+        children = value.values()
+    elif isinstance(value, list):
+        children = value
+    else:
+        return []
+    return [item for child in children for item in _nested_items(child)]
+
+def _batch_reply_items(content):
+    """
+    Every JSON object that decodes on its own in a batched reply, in order.
+    Each item is decoded separately, so a trailing comma, one malformed
+    item or a reply cut off at max_tokens only loses the items affected.
+    Items wrapped in an object such as {"results": [...]} are unwrapped.
+    """
+    items = []
+    position = content.find("{")
+    while position != -1:
+        try:
+            item, end = _JSON_DECODER.raw_decode(content, position)
+        except ValueError:
+            position = content.find("{", position + 1)
+            continue
+        items.extend(_nested_items(item) or [item])
+        position = content.find("{", end)
+    return items
+
+def _parse_batch_reply(content, count):
+    """Map claim number -> reply text for every well-formed item in a batched reply."""
+    parsed = {}
+    for position, item in enumerate(_batch_reply_items(content), 1):
+        item_id = item.get("id", position) if isinstance(item, dict) else position
+        try:
+            item_id = int(item_id)
+        except (TypeError, ValueError):
+            continue
+        text = _batch_item_text(item)
+        if text and 1 <= item_id <= count and item_id not in parsed:
+            parsed[item_id] = text
+    return parsed
+
+def fact_check_batch(client, context_texts, timeout=VERDICT_BATCH_TIMEOUT):
+    """
+    Fact-check several claims with one chat completion.
+    Returns one (ai_text, ai_error) pair per claim, with ai_text in the
+    single-claim reply format. Claims missing or malformed in the batched
+    reply are re-checked individually with the single-claim prompt.
+    """
+    if len(context_texts) <= 1 or not client:
+        return [_fact_check_single(client, c, timeout) for c in context_texts]
+
+    numbered = "\n\n".join(
+        f"CLAIM {i}:\n{context_text}" for i, context_text in enumerate(context_texts, 1)
     )
+    parsed = {}
+    try:
+        response = get_scheduler().call(
+            MODEL_NAME, PRIORITY_VERDICT, client.chat.completions.create,
+            model=MODEL_NAME,
+            messages=[
+                {"role": "system", "content": BATCH_VERDICT_SYSTEM_PROMPT},
+                {"role": "user", "content": numbered}
+            ],
+            max_tokens=min(250 * len(context_texts), 4000),
+            temperature=0.1,
+            timeout=timeout,
+            deadline=time.monotonic() + timeout
+        )
+        parsed = _parse_batch_reply(response.choices[0].message.content, len(context_texts))
+    except Exception as e:
+        print(f"Batched fact-check failed, falling back to single claims: {e}")
+
+    return [
+        (parsed[i], None) if i in parsed else _fact_check_single(client, context_text, timeout)
+        for i, context_text in enumerate(context_texts, 1)
+    ]
+
+class VerdictBatcher:
+    """
+    Collects fact-check requests from concurrent analyses and sends them
+    to the model in packs of up to max_batch claims.
+    """
+
+    def __init__(self, max_batch, max_wait=VERDICT_BATCH_WAIT):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="verdict-batch")
+        threading.Thread(target=self._collect, name="verdict-batcher", daemon=True).start()
+
+    def submit(self, context_text):
+        """Queue one claim; the returned future resolves to (ai_text, ai_error)."""
+        future = Future()
+        self._queue.put((context_text, future))
+        return future
+
+    def _collect(self):
+        while True:
+            items = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(items) < self.max_batch:
+                try:
+                    items.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            self._executor.submit(self._dispatch, items)
+
+    def _dispatch(self, items):
+        try:
+            results = fact_check_batch(get_client(), [context_text for context_text, _ in items])
+        except Exception as e:
+            results = [(None, e)] * len(items)
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
+_verdict_batcher = None
+_verdict_batcher_lock = threading.Lock()
+
+def set_verdict_batching(batch_size, max_wait=None):
+    """Pack up to batch_size concurrent verdict requests into one LLM call (1 disables)."""
+    global VERDICT_BATCH_SIZE, VERDICT_BATCH_WAIT, _verdict_batcher
+    with _verdict_batcher_lock:
+        VERDICT_BATCH_SIZE = batch_size
+        if max_wait is not None:
+            VERDICT_BATCH_WAIT = max_wait
+        _verdict_batcher = None
+
+def _get_verdict_batcher():
+    global _verdict_batcher
+    with _verdict_batcher_lock:
+        if _verdict_batcher is None and VERDICT_BATCH_SIZE > 1:
+            _verdict_batcher = VerdictBatcher(VERDICT_BATCH_SIZE, VERDICT_BATCH_WAIT)
+        return _verdict_batcher
+
+def fact_check(client, context_text, timeout):
+    """Verdict for one claim, through the batcher when batching is enabled."""
+    batcher = _get_verdict_batcher()
+    if batcher is None:
+        return _fact_check_single(client, context_text, timeout)
+    try:
+        return batcher.submit(context_text).result(timeout=timeout)
+    except Exception as e:
+        return None, e
+
+
+# ==================== ASYNC API ====================
+
+def get_async_client():
+    """
+    AsyncOpenAI counterpart of get_client(), shared by every call on the
+    running event loop and rebuilt only when the API key changes.
+    """
+    key = get_api_key()
+    if not key:
+        print("⚠️ API Key missing in get_async_client()")
+        return None
+    loop = asyncio.get_running_loop()
+    cached = _async_clients.get(loop)
+    if cached is None or cached[0] != key:
+        client = AsyncOpenAI(
+            base_url=MODELS_BASE_URL,
+            api_key=key,
+            http_client=DefaultAsyncHttpxClient(limits=_pool_limits()),
+            max_retries=0  # Retries go through the shared scheduler
+        )
+        _async_clients[loop] = cached = (key, client)
+    return cached[1]
+
+async def highlight_with_ai_async(claim, snippet, verdict, client, timeout=None, url=None):
+    """Async highlight_with_ai using the caller's AsyncOpenAI client."""
+    if not snippet or len(snippet) < 10 or client is None:
+        return snippet
+    timeout = HIGHLIGHT_TIMEOUT if timeout is None else timeout
+    try:
+        response = await asyncio.wait_for(
+            get_scheduler().call_async(
+                MODEL_NAME, PRIORITY_HIGHLIGHT, client.chat.completions.create,
+                model=MODEL_NAME,
+                messages=_highlight_messages(claim, snippet, verdict),
+                temperature=0.1,
+                max_tokens=300,
+                deadline=time.monotonic() + timeout
+            ),
+            timeout=timeout
+        )
+        highlighted = _style_highlight(snippet, response.choices[0].message.content.strip())
+        _store_highlight(claim, verdict, {"url": url, "body": snippet}, highlighted)
+        return highlighted
+    except Exception as e:
+        print(f"Highlighting error: {e!r}")
+        return snippet
+
+async def highlight_results_async(query, results, verdict, client, timeout=None):
+    """Async highlight_results: uncached snippets are highlighted concurrently."""
+    pending = []
+    for r in results:
+        cached = _cached_highlight(query, verdict, r)
+        if cached is None:
+            pending.append(r)
+        else:
+            r["highlighted_body"] = cached
+    highlighted = await asyncio.gather(*(
+        highlight_with_ai_async(query, r["body"], verdict, client, timeout, r.get("url")) for r in pending
+    ))
+    for r, body in zip(pending, highlighted):
+        r["highlighted_body"] = body
+    return results
+
+async def _wait_async(task, deadline, default=None):
+    """Async _wait: result of a pipeline task, or default on failure or deadline."""
+    if task is None:
+        return default
+    try:
+        return await asyncio.wait_for(task, timeout=_remaining(deadline))
+    except Exception as e:
+        print(f"Pipeline step skipped: {e!r}")
+        return default
+
+async def analyze_content_async(text, mode=None):
+    """
+    Asyncio version of analyze_content; returns the same tuple.
+    LLM calls use AsyncOpenAI and article downloads use httpx, so a single
+    event loop can keep many verifications in flight. DDGS has no async
+    API, so the search runs in a worker thread. Concurrent calls for the
+    same claim text share one computation, as in analyze_content: tasks on
+    this event loop await the in-flight call, and other processes wait on
+    the lock in CLAIM_LOCK_DB.
+    """
+    if _check_mode(mode) == "triage":
+        # Archive read and job-table write are blocking SQLite calls
+        return await asyncio.to_thread(triage_content, text)
+    lock_key = get_exact_hash(text)
+    result, shared = await _inflight_async.do(lock_key, _analyze_content_locked_async, text, lock_key)
+    return copy.deepcopy(result) if shared else result
+
+async def _analyze_content_locked_async(text, lock_key):
+    """_analyze_content_locked for the event loop; lock calls run in worker threads."""
+    if not CROSS_PROCESS_COALESCING:
+        return await _analyze_content_once_async(text)
+    
+    owner = f"{os.getpid()}:{threading.get_ident()}:{id(asyncio.current_task())}:{time.monotonic()}"
+    owned = await asyncio.to_thread(acquire_claim_lock, lock_key, owner, ANALYSIS_DEADLINE + 30)
+    if not owned:
+        deadline = time.monotonic() + ANALYSIS_DEADLINE
+        while time.monotonic() < deadline and await asyncio.to_thread(claim_lock_held, lock_key):
+            if (await asyncio.to_thread(get_cached_analysis, text, local_only=True))[1]:
+                break
+            await asyncio.sleep(COALESCE_POLL_INTERVAL)
+    try:
+        return await _analyze_content_once_async(text)
+    finally:
+        if owned:
+            await asyncio.to_thread(release_claim_lock, lock_key, owner)
+
+async def _analyze_content_once_async(text):
+    """A single, uncoalesced analyze_content_async."""
+    deadline = time.monotonic() + ANALYSIS_DEADLINE
+    
+    # ---------- 0. CHECK ARCHIVE FIRST ----------
+    client = get_async_client()
+    claim_key = get_claim_key(text)
+    
+    search_task = None
+    urls = extract_urls(text)
+    extraction_tasks = {}
+    
+    # Archive lookups (SQLite, similarity index) run off the event loop
+    cached_result, is_cached = await asyncio.to_thread(
+        get_cached_analysis, text, claim_key=claim_key, local_only=True
+    )
+    if not is_cached:
+        search_task = asyncio.create_task(asyncio.to_thread(search_related_articles, text))
+        for url in urls:
+            extraction_tasks[url] = asyncio.create_task(extract_article_content_async(url))
+        await claim_key.normalize_async(client)
+        cached_result, is_cached = await asyncio.to_thread(get_cached_analysis, text, claim_key=claim_key)
+    
+    if is_cached:
+        for task in extraction_tasks.values():
+            task.cancel()
+        related = cached_result.get("related_articles", [])
+        
+        if not related:
+            verdict = _verdict_from_score(cached_result["score"])
+            if search_task is None:
+                search_task = asyncio.create_task(asyncio.to_thread(search_related_articles, text))
+            hits = await _wait_async(search_task, deadline, [])
+            related = await highlight_results_async(text, hits, verdict, client, timeout=_remaining(deadline))
+        
+        return _result_tuple(cached_result, True, related)
+    
+    # ---------- 1-3. LOCAL CHECKS AND URL EXTRACTION ----------
+    style = _style_checks(text)
+    bodies = await asyncio.gather(*(_wait_async(task, deadline) for task in extraction_tasks.values()))
+    articles = dict(zip(extraction_tasks, bodies))
+    context_text = _claim_context(text, articles)
+    
+    # ---------- 4. AI FACT VERIFICATION ----------
+    ai_text = None
+    ai_error = None
+    try:
+        if not client:
+            raise ValueError("OpenAI Client failed to initialize (Missing Key).")
+        
+        response = await asyncio.wait_for(
+            get_scheduler().call_async(
+                MODEL_NAME, PRIORITY_VERDICT, client.chat.completions.create,
+                model=MODEL_NAME,
+                messages=_verdict_messages(context_text),
+                max_tokens=250,
+                temperature=0.1,
+                deadline=deadline
+            ),
+            timeout=max(1.0, _remaining(deadline))
+        )
+        ai_text = response.choices[0].message.content.strip()
+    except Exception as e:
+        ai_error = e
+    
+    # ---------- 5. SANITY CHECKS AND FINAL SCORE ----------
+    analysis_result, verdict = _assemble_analysis(text, style, articles, ai_text, ai_error)
+    
+    # ---------- 6. FIND RELATED ARTICLES ----------
+    hits = await _wait_async(search_task, deadline, [])
+    related_articles = await highlight_results_async(text, hits, verdict, client, timeout=_remaining(deadline))
+    analysis_result["related_articles"] = related_articles
+    
+    # ---------- 7. STORE IN ARCHIVE ----------
+    await asyncio.to_thread(store_analysis, text, analysis_result, claim_key=claim_key)
+    
+    return _result_tuple(analysis_result, False, related_articles)
 
 
 # ==================== CLI TEST ====================
 
 if __name__ == "__main__":
+    import sys
+    
+    # --triage prints the instant rule-only result; the full check still runs before exit
+    mode = "triage" if "--triage" in sys.argv[1:] else None
     user_input = input("Enter claim / news / URL:\n> ")
     
-    score, flags, ai_report, is_subjective, is_from_archive, checklist, related, pointers = analyze_content(user_input)
+    score, flags, ai_report, is_subjective, is_from_archive, checklist, related, pointers = analyze_content(user_input, mode)
     
     print("\n========== RESULT ==========")
     if is_from_archive:
@@ -382,6 +1150,8 @@ if __name__ == "__main__":
             print(f"✗ {check}")
         elif status == "uncertain":
             print(f"? {check}")
+        elif status == "pending":
+            print(f"… {check} (pending)")
         else:
             print(f"- {check} (N/A)")
     
@@ -402,4 +1172,8 @@ if __name__ == "__main__":
         for i, article in enumerate(related, 1):
             print(f"\n{i}. {article['title']}")
             print(f"   URL: {article['url']}")
-            print(f"   Snippet: {article.get('highlighted_body', article.get('body', ''))[:200]}...")
\ No newline at end of file
+            print(f"   Snippet: {article.get('highlighted_body', article.get('body', ''))[:200]}...")
+
+    if pending_verifications():
+        print("\n⏳ Provisional result; finishing the full verification in the background...")
+        wait_for_verifications()
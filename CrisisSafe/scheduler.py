@@ -0,0 +1,208 @@
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+
+import openai
+
+# Lower numbers are served first when callers queue for the same model
+PRIORITY_VERDICT = 0
+PRIORITY_NORMALIZATION = 1
+PRIORITY_HIGHLIGHT = 2
+
+# Default per-model budget; GitHub Models' free tier allows roughly
+# 15 requests/minute for gpt-4o-mini with small bursts.
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("CRISISSAFE_LLM_RPM", "15"))
+LLM_BURST = int(os.getenv("CRISISSAFE_LLM_BURST", "5"))
+LLM_MAX_RETRIES = int(os.getenv("CRISISSAFE_LLM_MAX_RETRIES", "4"))
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+
+
+class TokenBucket:
+    """Requests-per-second budget with a burst allowance and an optional pause."""
+
+    def __init__(self, rate_per_second, capacity):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def take(self):
+        """Take a token; returns 0 on success, else seconds until one is available."""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+def _retry_after(error):
+    """Seconds the server asked us to wait, from Retry-After / retry-after-ms headers."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def _is_retryable(error):
+    """429s, 5xx responses, timeouts and dropped connections are worth retrying."""
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    status = getattr(error, "status_code", None)
+    return status == 429 or (status is not None and status >= 500)
+
+
+class LLMScheduler:
+    """
+    Shared gate for every LLM call in the process.
+    Each model has a token bucket; callers waiting on the same model are
+    served in priority order (verdict, then normalization, then
+    highlighting). Retryable failures back off exponentially with jitter,
+    honouring Retry-After, and a 429 pauses the whole model so other
+    callers do not pile onto the limit.
+    """
+
+    def __init__(self, requests_per_minute=LLM_REQUESTS_PER_MINUTE, burst=LLM_BURST,
+                 max_retries=LLM_MAX_RETRIES):
+        self.rate = requests_per_minute / 60.0
+        self.burst = burst
+        self.max_retries = max_retries
+        self._buckets = {}
+        self._waiters = {}
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    def _enqueue(self, model, priority):
+        with self._cond:
+            if model not in self._buckets:
+                self._buckets[model] = TokenBucket(self.rate, self.burst)
+                self._waiters[model] = []
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._waiters[model], ticket)
+            return ticket
+
+    def _poll(self, model, ticket):
+        """Try to take a token for ticket; returns 0 once granted, else a wait hint."""
+        with self._cond:
+            waiters = self._waiters[model]
+            if waiters[0] != ticket:
+                return 0.05
+            wait = self._buckets[model].take()
+            if wait == 0:
+                heapq.heappop(waiters)
+                self._cond.notify_all()
+            return wait
+
+    def _abandon(self, model, ticket):
+        with self._cond:
+            waiters = self._waiters[model]
+            if ticket in waiters:
+                waiters.remove(ticket)
+                heapq.heapify(waiters)
+                self._cond.notify_all()
+
+    def acquire(self, model, priority, deadline=None):
+        """Block until this caller may send one request to model."""
+        ticket = self._enqueue(model, priority)
+        try:
+            while True:
+                wait = self._poll(model, ticket)
+                if wait == 0:
+                    return
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"Timed out waiting for {model} rate limit")
+                    wait = min(wait, remaining)
+                with self._cond:
+                    self._cond.wait(timeout=wait)
+        except BaseException:
+            self._abandon(model, ticket)
+            raise
+
+    async def acquire_async(self, model, priority, deadline=None):
+        """acquire() for coroutines; waits with asyncio.sleep instead of blocking."""
+        ticket = self._enqueue(model, priority)
+        try:
+            while True:
+                wait = self._poll(model, ticket)
+                if wait == 0:
+                    return
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"Timed out waiting for {model} rate limit")
+                    wait = min(wait, remaining)
+                await asyncio.sleep(min(wait, 0.05))
+        except BaseException:
+            self._abandon(model, ticket)
+            raise
+
+    def _backoff(self, model, attempt, error, deadline):
+        """Delay before the next attempt, or None if we should give up."""
+        if attempt >= self.max_retries or not _is_retryable(error):
+            return None
+        delay = _retry_after(error)
+        if delay is None:
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+            delay = random.uniform(delay / 2, delay)
+        if getattr(error, "status_code", None) == 429:
+            with self._cond:
+                bucket = self._buckets[model]
+                bucket.paused_until = max(bucket.paused_until, time.monotonic() + delay)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return None
+        return delay
+
+    def call(self, model, priority, fn, /, *args, deadline=None, **kwargs):
+        """Run fn(*args, **kwargs) under the model's budget, retrying transient failures."""
+        attempt = 0
+        while True:
+            self.acquire(model, priority, deadline)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._backoff(model, attempt, e, deadline)
+                if delay is None:
+                    raise
+                print(f"LLM call failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+
+    async def call_async(self, model, priority, fn, /, *args, deadline=None, **kwargs):
+        """call() for coroutine functions such as AsyncOpenAI methods."""
+        attempt = 0
+        while True:
+            await self.acquire_async(model, priority, deadline)
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._backoff(model, attempt, e, deadline)
+                if delay is None:
+                    raise
+                print(f"LLM call failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
+
+
+_scheduler = LLMScheduler()
+
+
+def get_scheduler():
+    """The process-wide scheduler shared by every LLM call site."""
+    return _scheduler
@@ -0,0 +1,49 @@
+import re
+
+# Unicode ranges of writing systems that mark a search hit as non-English.
+# Extend SCRIPT_RANGES (or pass ranges to ScriptFilter) to add more.
+SCRIPT_RANGES = {
+    "cjk": r"\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af",
+    "cyrillic": r"\u0400-\u04ff\u0500-\u052f",
+    "greek": r"\u0370-\u03ff",
+    "arabic": r"\u0600-\u06ff\u0750-\u077f\ufb50-\ufdff\ufe70-\ufefc",
+    "hebrew": r"\u0590-\u05ff",
+    "devanagari": r"\u0900-\u097f",
+    "bengali": r"\u0980-\u09ff",
+    "thai": r"\u0e00-\u0e7f",
+}
+
+DEFAULT_BLOCKED_SCRIPTS = ("cjk", "cyrillic", "arabic", "hebrew", "thai")
+
+
+class ScriptFilter:
+    """
+    Precompiled script detector for search hits.
+
+    All blocked ranges are folded into a single character class, so a clean
+    hit costs one regex scan; only rejected hits pay for working out which
+    script matched.
+    """
+
+    def __init__(self, scripts=DEFAULT_BLOCKED_SCRIPTS, ranges=None):
+        ranges = ranges or SCRIPT_RANGES
+        unknown = [name for name in scripts if name not in ranges]
+        if unknown:
+            raise ValueError(f"Unknown scripts: {', '.join(unknown)}")
+        self.scripts = tuple(scripts)
+        self._per_script = [(name, re.compile(f"[{ranges[name]}]")) for name in self.scripts]
+        combined = "".join(ranges[name] for name in self.scripts)
+        self._combined = re.compile(f"[{combined}]") if combined else None
+
+    def __call__(self, text):
+        """Name of the first blocked script found in text, or None if it is clean."""
+        if self._combined is None:
+            return None
+        match = self._combined.search(text)
+        if match is None:
+            return None
+        char = match.group(0)
+        for name, pattern in self._per_script:
+            if pattern.match(char):
+                return name
+        return "other"
@@ -0,0 +1,200 @@
+import re
+import threading
+import zlib
+
+import numpy as np
+
+# Width of the hashed feature space. Collisions only add a little noise to
+# the cosine score; 2048 float32 dims keep 10k claims under 100 MB.
+VECTOR_DIM = 2048
+CHAR_NGRAM = 3
+
+_STOPWORDS = frozenset({
+    "the", "a", "an", "is", "are", "was", "were", "be", "been", "it", "its",
+    "of", "to", "in", "on", "at", "for", "and", "or", "that", "this", "do",
+    "does", "did", "has", "have", "had", "as", "by", "with", "from",
+})
+
+# Words that flip a claim's meaning. Near duplicates must agree on them;
+# every other word only moves the cosine score.
+_NEGATIONS = frozenset({
+    "not", "no", "never", "nor", "none", "nothing", "nobody", "neither", "cannot", "cant",
+    "dont", "doesnt", "didnt", "isnt", "arent", "wasnt", "werent", "wont", "hasnt",
+    "havent", "hadnt", "shouldnt", "wouldnt", "couldnt",
+})
+# Antonym groups: a claim's sequence of (group, side) labels must match
+_ANTONYMS = [
+    ({"confirm", "confirms", "confirmed", "true", "real", "genuine", "verified", "proven"},
+     {"deny", "denies", "denied", "false", "fake", "hoax", "myth", "debunked", "untrue", "rumour", "rumor"}),
+    ({"safe", "harmless", "healthy", "beneficial"},
+     {"unsafe", "dangerous", "harmful", "deadly", "fatal", "toxic", "lethal"}),
+    ({"open", "opened", "reopened", "reopen"}, {"closed", "close", "shut", "blocked"}),
+    ({"increase", "increases", "increased", "rise", "rises", "rising", "more", "higher"},
+     {"decrease", "decreases", "decreased", "fall", "falls", "falling", "less", "lower", "fewer"}),
+    ({"alive", "survived", "rescued", "found"}, {"dead", "died", "killed", "missing"}),
+    ({"cure", "cures", "cured", "prevent", "prevents", "prevented", "protects"},
+     {"cause", "causes", "caused", "spread", "spreads"}),
+    ({"lifted", "allowed", "permitted", "legal"}, {"imposed", "banned", "ban", "illegal"}),
+]
+_POLARITY = {word: f"{group}{side}" for group, sides in enumerate(_ANTONYMS)
+             for side, words in enumerate(sides) for word in words}
+# Capitalized words that do not name a place or person
+_NOT_NAMES = _STOPWORDS | {
+    "what", "who", "why", "when", "where", "which", "how", "can", "could", "will", "would",
+    "should", "may", "might", "must", "i", "we", "you", "he", "she", "they", "there", "here",
+    "breaking", "urgent", "alert", "update", "news", "share", "forward", "please", "just",
+    "all", "every", "some", "many", "no", "not",
+}
+
+_COVID_RE = re.compile(r'\b(?:covid[\s-]*19|covid|coronavirus|sars[\s-]*cov[\s-]*2)\b', re.IGNORECASE)
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+")
+
+
+def _tokens(text):
+    text = _COVID_RE.sub("covid19", text.lower().replace("'", "").replace("’", ""))
+    return _TOKEN_RE.findall(text)
+
+
+def _stem(token):
+    return token[:-1] if len(token) > 3 and token.endswith("s") and not token.endswith("ss") else token
+
+
+class ClaimTerms:
+    """
+    The parts of a claim near duplicates must agree on: the negation count,
+    the numbers, the antonym labels (all in order) and the names of places
+    and people, i.e. words capitalized in the original text. A name in
+    either claim must appear in both, in the same order, so swapped or
+    substituted names ("India attacked Pakistan" / "Pakistan attacked
+    India", "Madurai" / "Chennai") never match; names written in lowercase
+    on both sides are not recognised.
+    """
+
+    __slots__ = ("words", "names", "fixed")
+
+    def __init__(self, text):
+        raw = _TOKEN_RE.findall(_COVID_RE.sub("covid19", text.replace("'", "").replace("’", "")))
+        # Judging case in an all-caps claim would make every word a name
+        letters = [c for c in text if c.isalpha()]
+        cased = bool(letters) and sum(c.isupper() for c in letters) <= len(letters) / 2
+        words = []
+        names = set()
+        negations = 0
+        numbers = []
+        polarity = []
+        for token in raw:
+            lower = token.lower()
+            if lower in _NEGATIONS:
+                negations += 1
+            elif lower in _POLARITY:
+                polarity.append(_POLARITY[lower])
+            elif lower != "covid19" and any(c.isdigit() for c in lower):
+                numbers.append(lower)
+            if lower in _STOPWORDS:
+                continue
+            word = _stem(lower)
+            words.append(word)
+            if cased and token[0].isupper() and lower not in _NOT_NAMES:
+                names.add(word)
+        self.words = tuple(words)
+        self.names = frozenset(names)
+        self.fixed = (negations, tuple(numbers), tuple(polarity))
+
+    def agrees(self, other):
+        """Whether other states the same facts as far as these terms can tell."""
+        if self.fixed != other.fixed:
+            return False
+        names = self.names | other.names
+        if not names:
+            return True
+        ours = [w for w in self.words if w in names]
+        theirs = [w for w in other.words if w in names]
+        return set(ours) == names and ours == theirs
+
+
+def embed(text, dim=VECTOR_DIM):
+    """
+    Hashed bag of word unigrams and character n-grams, L2-normalized.
+    Deterministic across processes (crc32, not Python's salted hash).
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    words = [t for t in _tokens(text) if t not in _STOPWORDS]
+    for word in words:
+        vector[zlib.crc32(b"w:" + word.encode()) % dim] += 1.0
+    joined = f" {' '.join(words)} "
+    for i in range(len(joined) - CHAR_NGRAM + 1):
+        vector[zlib.crc32(joined[i:i + CHAR_NGRAM].encode()) % dim] += 1.0
+    # Sublinear term frequency so repeated words do not dominate
+    np.log1p(vector, out=vector)
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+class ClaimIndex:
+    """
+    In-memory cosine-similarity index over normalized claims.
+    Rows are keyed by claim hash; adding an existing hash replaces its row.
+    The cosine score over the normalized text measures paraphrase; a
+    candidate is only returned if its ClaimTerms, taken from the original
+    claim, agree with the query's.
+    """
+
+    def __init__(self, dim=VECTOR_DIM):
+        self.dim = dim
+        self._matrix = np.zeros((64, dim), dtype=np.float32)
+        self._hashes = []
+        self._terms = []
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def add(self, claim_hash, text, claim=None):
+        """
+        Index (or re-index) the normalized text of an archived claim; claim
+        is its original wording (defaults to text).
+        """
+        if not text:
+            return
+        vector = embed(text, self.dim)
+        terms = ClaimTerms(claim or text)
+        with self._lock:
+            row = self._rows.get(claim_hash)
+            if row is None:
+                row = len(self._hashes)
+                if row == self._matrix.shape[0]:
+                    grown = np.zeros((row * 2, self.dim), dtype=np.float32)
+                    grown[:row] = self._matrix
+                    self._matrix = grown
+                self._hashes.append(claim_hash)
+                self._terms.append(terms)
+                self._rows[claim_hash] = row
+            else:
+                self._terms[row] = terms
+            self._matrix[row] = vector
+
+    def query(self, text, threshold, claim=None):
+        """
+        Return (claim_hash, similarity) of the closest indexed claim scoring
+        at least threshold whose terms agree with claim (defaults to text),
+        or (None, best_score) when nothing qualifies.
+        """
+        if not text:
+            return None, 0.0
+        vector = embed(text, self.dim)
+        terms = ClaimTerms(claim or text)
+        with self._lock:
+            count = len(self._hashes)
+            if count == 0:
+                return None, 0.0
+            scores = self._matrix[:count] @ vector
+            candidates = np.flatnonzero(scores >= threshold)
+            # Best-first over the few rows above the threshold only
+            for row in candidates[np.argsort(scores[candidates])[::-1]]:
+                if self._terms[row].agrees(terms):
+                    return self._hashes[row], float(scores[row])
+            return None, float(scores.max())
+
+    def __len__(self):
+        with self._lock:
+            return len(self._hashes)
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import weakref
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key: the first caller runs the
+    function, later callers block until it finishes and get the same result
+    (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """Return (result, shared); shared is True when another caller computed it."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def in_flight(self):
+        """Number of keys currently being computed."""
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight for coroutines. Calls are coalesced per event loop: the
+    first caller's coroutine runs as a task and every caller awaits it, so
+    one caller being cancelled does not cancel the others.
+    """
+
+    def __init__(self):
+        self._calls = weakref.WeakKeyDictionary()
+
+    async def do(self, key, fn, *args, **kwargs):
+        """Return (result, shared); shared is True when another caller started it."""
+        loop = asyncio.get_running_loop()
+        calls = self._calls.setdefault(loop, {})
+        task = calls.get(key)
+        leader = task is None
+        if leader:
+            task = calls[key] = loop.create_task(fn(*args, **kwargs))
+            task.add_done_callback(lambda _: calls.pop(key, None))
+        return await asyncio.shield(task), not leader
+
+    def in_flight(self):
+        """Number of keys currently being computed, across event loops."""
+        return sum(len(calls) for calls in list(self._calls.values()))
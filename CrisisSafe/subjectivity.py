@@ -0,0 +1,210 @@
+import importlib.util
+import os
+import re
+import xml.etree.ElementTree as ElementTree
+
+import numpy as np
+
+# Fast re-implementation of TextBlob's PatternAnalyzer subjectivity.
+# TextBlob(text).sentiment costs a heavy import, a lazy lexicon load on the
+# first call and per-call polarity/label bookkeeping we never read. Here the
+# en-sentiment.xml lexicon shipped with textblob is read once at import into
+# a flat {word: (subjectivity, intensity, is_modifier)} dict, and only the
+# subjectivity half of pattern's scoring is run.
+
+
+def _textblob_lexicon_path():
+    """Locate textblob's en-sentiment.xml without importing textblob."""
+    spec = importlib.util.find_spec("textblob")
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    return os.path.join(list(spec.submodule_search_locations)[0], "en", "en-sentiment.xml")
+
+
+SENTIMENT_LEXICON = os.getenv("CRISISSAFE_SENTIMENT_LEXICON") or _textblob_lexicon_path()
+
+# ---------- Tokenizer constants (mirroring textblob._text) ----------
+_PUNCTUATION = ".,;:!?()[]{}`''\"@#$^&*+-|=~_"
+_LEADING = tuple(_PUNCTUATION.replace(".", ""))
+_TRAILING = _LEADING + (".",)
+_ABBREVIATIONS = {
+    "a.", "adj.", "adv.", "al.", "a.m.", "c.", "cf.", "comp.", "conf.", "def.",
+    "ed.", "e.g.", "esp.", "etc.", "ex.", "f.", "fig.", "gen.", "id.", "i.e.",
+    "int.", "l.", "m.", "Med.", "Mil.", "Mr.", "n.", "n.q.", "orig.", "pl.",
+    "pred.", "pres.", "p.m.", "ref.", "v.", "vs.", "w/",
+}
+_RE_ABBR1 = re.compile(r"^[A-Za-z]\.$")
+_RE_ABBR2 = re.compile(r"^([A-Za-z]\.)+$")
+_RE_ABBR3 = re.compile("^[A-Z][" + "|".join("bcdfghjklmnpqrstvwxz") + "]+.$")
+_CONTRACTIONS = (("'d", " 'd"), ("'m", " 'm"), ("'s", " 's"), ("'ll", " 'll"),
+                 ("'re", " 're"), ("'ve", " 've"), ("n't", " n't"))
+_QUOTES = (("“", " “ "), ("”", " ” "), ("‘", " ‘ "), ("’", " ’ "), ("'", " ' "), ('"', ' " '))
+_EMOTICONS = (
+    "<3", "♥",
+    ">:D", ":-D", ":D", "=-D", "=D", "X-D", "x-D", "XD", "xD", "8-D",
+    ">:P", ":-P", ":P", ":-p", ":p", ":-b", ":b", ":c)", ":o)", ":^)",
+    ">:)", ":-)", ":)", "=)", "=]", ":]", ":}", ":>", ":3", "8)", "8-)",
+    ">;]", ";-)", ";)", ";-]", ";]", ";D", ";^)", "*-)", "*)",
+    ">:o", ":-O", ":O", ":o", ":-o", "o_O", "o.O", "°O°", "°o°",
+    ">:/", ":-/", ":/", ":\\", ">:\\", ":-.", ":-s", ":s", ":S", ":-S", ">.>",
+    ">:[", ":-(", ":(", "=(", ":-[", ":[", ":{", ":-<", ":c", ":-c", "=/",
+    ":'(", ":'''(", ";'(",
+)
+_EMOTICON_SET = {e.lower() for e in _EMOTICONS}
+_RE_EMOTICONS = re.compile(r"(%s)($|\s)" % "|".join(r" ?".join(re.escape(c) for c in e) for e in _EMOTICONS))
+_RE_SARCASM = re.compile(r"\( ?\! ?\)")
+_RE_LINEBREAK = re.compile(r"\n{2,}")
+
+_NEGATIONS = {"no", "not", "n't", "never"}
+
+
+def _load_lexicon(path):
+    """
+    {word: (subjectivity, intensity, is_modifier)} with pattern's averaging:
+    senses are averaged per part of speech, then across parts of speech, and
+    every adjective also gets an "-ly" adverb entry.
+    """
+    if not path or not os.path.exists(path):
+        print(f"Sentiment lexicon not found: {path}")
+        return {}
+    words = {}
+    for node in ElementTree.parse(path).getroot().iter("word"):
+        form = node.attrib.get("form")
+        if form:
+            psi = (float(node.attrib.get("polarity", 0.0)),
+                   float(node.attrib.get("subjectivity", 0.0)),
+                   float(node.attrib.get("intensity", 1.0)))
+            words.setdefault(form, {}).setdefault(node.attrib.get("pos"), []).append(psi)
+
+    def mean(rows):
+        return [sum(column) / len(column) for column in zip(*rows)]
+
+    entries = {}
+    for form, senses in words.items():
+        by_pos = {pos: mean(rows) for pos, rows in senses.items()}
+        by_pos[None] = mean(by_pos.values())
+        entries[form] = by_pos
+    # Same "terrible" -> "terribly" expansion as textblob.en.Sentiment.load
+    for form, by_pos in list(entries.items()):
+        if "JJ" in by_pos:
+            if form.endswith("y"):
+                form = form[:-1] + "i"
+            if form.endswith("le"):
+                form = form[:-2]
+            adverb = entries.setdefault(form + "ly", {})
+            adverb["RB"] = adverb[None] = by_pos["JJ"]
+    return {form: (by_pos[None][1], by_pos[None][2], "RB" in by_pos) for form, by_pos in entries.items()}
+
+
+_LEXICON = _load_lexicon(SENTIMENT_LEXICON)
+
+
+def _is_abbreviation(token):
+    return (token in _ABBREVIATIONS or _RE_ABBR1.match(token) is not None
+            or _RE_ABBR2.match(token) is not None or _RE_ABBR3.match(token) is not None)
+
+
+def tokenize(text):
+    """Lowercased tokens exactly as pattern's find_tokens feeds them to the scorer."""
+    for old, new in _CONTRACTIONS:
+        text = text.replace(old, new)
+    for old, new in _QUOTES:
+        text = text.replace(old, new)
+    text = _RE_LINEBREAK.sub(" ", text.replace("\r\n", "\n"))
+    tokens = []
+    for t in text.split():
+        if t.isalnum():
+            # No leading or trailing punctuation to split off
+            tokens.append(t)
+            continue
+        tail = []
+        while t.startswith(_LEADING):
+            tokens.append(t[0])
+            t = t[1:]
+        while t.endswith(_TRAILING):
+            if t.endswith(_LEADING):
+                tail.append(t[-1])
+                t = t[:-1]
+            if t.endswith("..."):
+                tail.append("...")
+                t = t[:-3].rstrip(".")
+            if t.endswith("."):
+                if _is_abbreviation(t):
+                    break
+                tail.append(t[-1])
+                t = t[:-1]
+        if t:
+            tokens.append(t)
+        tokens.extend(reversed(tail))
+    joined = " ".join(tokens)
+    if "(" in joined:
+        joined = _RE_SARCASM.sub("(!)", joined)
+    joined = _RE_EMOTICONS.sub(lambda m: m.group(1).replace(" ", "") + m.group(2), joined)
+    return joined.lower().split()
+
+
+def _assess(tokens):
+    """Subjectivity of every assessed chunk, following pattern's Sentiment.assessments."""
+    scores = []
+    last_intensity = 1.0
+    modifier = None
+    negation = None
+    for w in tokens:
+        entry = _LEXICON.get(w)
+        if entry is not None:
+            s, i, is_modifier = entry
+            if modifier is None:
+                scores.append(s)
+            else:
+                # "really good": the modifier's chunk takes this word, scaled
+                scores[-1] = max(-1.0, min(s * last_intensity, 1.0))
+            last_intensity = i
+            if negation is not None:
+                last_intensity = 1.0 / last_intensity
+            modifier = w if is_modifier else None
+            negation = w if w in _NEGATIONS else None
+        else:
+            if w in _NEGATIONS:
+                negation = w
+            elif negation and len(w.strip("'")) > 1:
+                negation = None
+            if negation is not None and modifier is not None and modifier.endswith("ly"):
+                negation = None
+            elif modifier and len(w) > 2:
+                modifier = None
+            if w == "(!)":
+                scores.append(1.0)
+                last_intensity = 1.0
+            if not w.isalpha() and len(w) <= 5 and w not in _PUNCTUATION and w in _EMOTICON_SET:
+                scores.append(1.0)
+                last_intensity = 1.0
+    return scores
+
+
+def subjectivity(text):
+    """Subjectivity in [0, 1], matching TextBlob(text).sentiment.subjectivity."""
+    scores = _assess(tokenize(text))
+    return sum(scores) / (len(scores) or 1)
+
+
+def subjectivity_batch(texts):
+    """
+    Subjectivity of many texts as a NumPy array, for feature matrices.
+    Each text is still tokenized and scored in Python, like subjectivity():
+    pattern's modifier and negation rules run token by token. Only the final
+    averaging is vectorized, with bincount over one flat array of chunk scores.
+    """
+    texts = list(texts)
+    flat = []
+    owners = []
+    for index, text in enumerate(texts):
+        scores = _assess(tokenize(text))
+        flat.extend(scores)
+        owners.extend([index] * len(scores))
+    count = len(texts)
+    if not flat:
+        return np.zeros(count)
+    owners = np.asarray(owners, dtype=np.intp)
+    totals = np.bincount(owners, weights=np.asarray(flat, dtype=float), minlength=count)
+    chunks = np.bincount(owners, minlength=count)
+    return totals / np.maximum(chunks, 1)
@@ -0,0 +1,28 @@
+from ruleengine import RuleEngine
+
+RULES = [
+    {"id": "fiveg", "keywords": ["5g"], "score_delta": -5},
+    {"id": "fiveg_covid", "stage": "sanity", "pattern": r"5g causes covid", "score_cap": 20},
+    {"id": "caps_5g", "pattern": r"5G", "case_sensitive": True},
+    {"id": "caps_5g_claim", "pattern": r"5G causes", "case_sensitive": True},
+]
+
+TEXTS = [
+    "5G causes covid",
+    "5g causes covid, they say. 5G towers everywhere",
+    "no towers here",
+]
+
+
+def test_rules_matching_at_the_same_offset_all_fire():
+    matches = RuleEngine(RULES).evaluate("5G causes covid")
+    assert matches.ids() == ["fiveg", "fiveg_covid", "caps_5g", "caps_5g_claim"]
+    assert matches.apply("sanity", 100, []) == 20
+
+
+def test_evaluate_agrees_with_evaluate_batch():
+    engine = RuleEngine(RULES)
+    batch = engine.evaluate_batch(TEXTS)
+    for row, text in enumerate(TEXTS):
+        fired = [r["id"] for r in RULES if batch.loc[row, f"fired_{r['id']}"]]
+        assert engine.evaluate(text).ids() == fired
@@ -0,0 +1,39 @@
+import pytest
+
+from similarity import ClaimIndex
+
+THRESHOLD = 0.8
+
+
+@pytest.fixture
+def index():
+    index = ClaimIndex()
+    for claim_hash, claim in [
+        ("contagious", "Is COVID-19 contagious?"),
+        ("bridge", "WHO confirms the Madurai bridge collapsed after heavy rain"),
+        ("attack", "India attacked Pakistan"),
+        ("closed", "The bridge is closed"),
+        ("dead", "5 dead in floods"),
+    ]:
+        index.add(claim_hash, claim)
+    return index
+
+
+@pytest.mark.parametrize("claim", [
+    "Is COVID-19 a contagious disease?",
+    "Is the COVID-19 virus contagious?",
+    "Is Covid contagious",
+])
+def test_rewordings_match(index, claim):
+    assert index.query(claim, THRESHOLD)[0] == "contagious"
+
+
+@pytest.mark.parametrize("claim", [
+    "WHO denies the Madurai bridge collapsed after heavy rain",
+    "WHO confirms the Chennai bridge collapsed after heavy rain",
+    "Pakistan attacked India",
+    "The bridge is not closed",
+    "50 dead in floods",
+])
+def test_meaning_changes_do_not_match(index, claim):
+    assert index.query(claim, THRESHOLD)[0] is None
@@ -0,0 +1,50 @@
+import random
+
+import numpy as np
+import pytest
+
+from subjectivity import _LEXICON, subjectivity, subjectivity_batch
+
+TextBlob = pytest.importorskip("textblob").TextBlob
+
+EDGE_CASES = [
+    "",
+    "The vaccine is not very safe!!",
+    "This is absolutely terrible :) but not bad",
+    "I'm really not sure it's good.",
+    "BREAKING: Govt says water is SAFE (!) to drink",
+    "e.g. the U.S. said the flood was awful... truly awful.",
+    "Never happy, never sad :-( ok",
+    "“Amazing” results, Mr. Smith said\n\nThe next paragraph is simply wonderful.",
+    "Don't panic: the dam is NOT broken, officials say.",
+]
+
+
+def _random_claims(count, seed=7):
+    vocabulary = list(_LEXICON)[:400] + [
+        "not", "no", "never", "very", "really", "is", "a", "the", "flood", "city",
+        "!", "?", "...", ":)", ":(", "(!)", "don't", "isn't", "\"", "U.S.", "e.g.",
+    ]
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 25))) for _ in range(count)]
+
+
+SAMPLES = EDGE_CASES + _random_claims(1500)
+
+
+@pytest.fixture(scope="module")
+def expected():
+    return np.asarray([TextBlob(text).sentiment.subjectivity for text in SAMPLES])
+
+
+def test_subjectivity_matches_textblob(expected):
+    actual = np.asarray([subjectivity(text) for text in SAMPLES])
+    np.testing.assert_allclose(actual, expected, atol=1e-9)
+
+
+def test_subjectivity_batch_matches_textblob(expected):
+    np.testing.assert_allclose(subjectivity_batch(SAMPLES), expected, atol=1e-9)
+
+
+def test_subjectivity_batch_empty():
+    assert subjectivity_batch([]).shape == (0,)
@@ -0,0 +1,190 @@
+import re
+import threading
+
+import numpy as np
+
+# Character-level NumPy view of many texts at once, used by the batch
+# heuristics. Texts are joined with a NUL separator and decoded to one
+# uint32 code point array; per-character class tables (built once for the
+# Basic Multilingual Plane) stand in for str.isupper / re's \w, so word and
+# run statistics for every text come out of a handful of array operations.
+
+_SEPARATOR = "\x00"
+_BMP = 0x10000
+_HASH_BASE = 1000003
+
+# Bits of the per-character class table
+_WORD, _SPACE, _UPPER, _LOWER = 1, 2, 4, 8
+
+_tables = None
+_tables_lock = threading.Lock()
+
+
+def _char_tables():
+    """Lookup tables indexed by BMP code point; characters beyond it count as symbols."""
+    global _tables
+    with _tables_lock:
+        if _tables is None:
+            chars = [chr(c) for c in range(_BMP)]
+            word = np.fromiter((c == "_" or c.isalnum() for c in chars), dtype=bool, count=_BMP)
+            space = np.fromiter((c.isspace() for c in chars), dtype=bool, count=_BMP)
+            upper = np.fromiter((c.isupper() for c in chars), dtype=bool, count=_BMP)
+            # Cased but not uppercase: any of these makes str.isupper() False
+            lower = np.fromiter((c.islower() or (c.istitle() and not c.isupper()) for c in chars),
+                                dtype=bool, count=_BMP)
+            folded = np.fromiter((ord(c.lower()) if len(c.lower()) == 1 else ord(c) for c in chars),
+                                 dtype=np.uint32, count=_BMP)
+            space[0] = True  # The separator ends words
+            word[0] = False
+            classes = (word * _WORD | space * _SPACE | upper * _UPPER | lower * _LOWER).astype(np.uint8)
+            _tables = {"classes": classes, "folded": folded}
+        return _tables
+
+
+def _runs(mask):
+    """(start, end) index arrays of the runs of True in mask; end is inclusive."""
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[0::2], edges[1::2] - 1
+
+
+def phrase_hash(codepoints):
+    """Polynomial hash (mod 2**64) matching TextBatch's rolling window hash."""
+    value = 0
+    power = 1
+    for c in codepoints:
+        value = (value + c * power) % 2 ** 64
+        power = (power * _HASH_BASE) % 2 ** 64
+    return value
+
+
+class TextBatch:
+    """Vectorized character and word statistics for a list of texts."""
+
+    def __init__(self, texts):
+        self.texts = list(texts)
+        self.size = len(self.texts)
+        tables = _char_tables()
+        lengths = np.fromiter(map(len, self.texts), dtype=np.intp, count=self.size)
+        joined = _SEPARATOR.join(self.texts)
+        self.codepoints = np.frombuffer(joined.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+        self.owner = np.repeat(np.arange(self.size), lengths + 1)[:self.codepoints.size]
+        self._tables = tables
+        self._astral = None
+        if self.codepoints.size and self.codepoints.max() >= _BMP:
+            self._astral = self.codepoints >= _BMP
+            self._index = np.where(self._astral, 0, self.codepoints)
+        else:
+            self._index = self.codepoints
+        self._classes = tables["classes"][self._index]
+        if self._astral is not None:
+            self._classes[self._astral] = 0
+        self.is_word = (self._classes & _WORD) != 0
+        self.is_space = (self._classes & _SPACE) != 0
+        self._folded = None
+        self._word_stats = None
+        self._candidates = None
+
+    @property
+    def folded(self):
+        """Lowercased code points (single-character mappings only)."""
+        if self._folded is None:
+            self._folded = self._tables["folded"][self._index]
+            if self._astral is not None:
+                self._folded = np.where(self._astral, self.codepoints, self._folded)
+        return self._folded
+
+    def _per_text(self, positions):
+        """Count of positions falling in each text."""
+        return np.bincount(self.owner[positions], minlength=self.size)
+
+    def word_stats(self):
+        """(words, uppercase_words) per text, splitting like str.split()."""
+        if self._word_stats is None:
+            starts, ends = _runs(~self.is_space)
+            if starts.size:
+                # OR of the class bits of each word (plus the spaces after it)
+                cased = np.bitwise_or.reduceat(self._classes, starts)
+            else:
+                cased = np.zeros(0, dtype=np.uint8)
+            is_upper_word = ((cased & _UPPER) != 0) & ((cased & _LOWER) == 0) & (ends > starts)
+            words = self._per_text(starts)
+            upper_words = self._per_text(starts[is_upper_word])
+            self._word_stats = (words, upper_words)
+        return self._word_stats
+
+    def uppercase_ratio(self):
+        """Share of words (longer than one character) that are all caps."""
+        words, upper_words = self.word_stats()
+        return upper_words / np.maximum(words, 1)
+
+    def shouting_tokens(self):
+        """Matches of \\b[A-Z]{4,}\\b per text."""
+        starts, ends = _runs((self.codepoints >= 65) & (self.codepoints <= 90))
+        n = self.codepoints.size
+        before_ok = (starts == 0) | ~self.is_word[np.maximum(starts - 1, 0)]
+        after_ok = (ends == n - 1) | ~self.is_word[np.minimum(ends + 1, n - 1)]
+        keep = (ends - starts + 1 >= 4) & before_ok & after_ok
+        return self._per_text(starts[keep])
+
+    def punctuation_runs(self, marks="!?"):
+        """Runs of two or more of the same mark (!! or ??) per text."""
+        total = np.zeros(self.size, dtype=np.intp)
+        for mark in marks:
+            starts, ends = _runs(self.codepoints == ord(mark))
+            total += self._per_text(starts[ends > starts])
+        return total
+
+    def phrase_counts(self, phrases):
+        """
+        Case-insensitive matches of any phrase, not inside a longer word
+        (like (?<!\\w)(?:...)(?!\\w) with re.IGNORECASE), per text. Each start
+        offset counts once. Candidate offsets are narrowed to the phrases'
+        first two letters, then their windows are compared by 64-bit polynomial
+        hash, built one character column at a time.
+        """
+        by_length = {}
+        prefixes = set()
+        singles = set()
+        for phrase in phrases:
+            folded = [int(self._tables["folded"][ord(c)]) if ord(c) < _BMP else ord(c) for c in phrase]
+            if folded:
+                by_length.setdefault(len(folded), set()).add(phrase_hash(folded))
+                if len(folded) > 1:
+                    prefixes.add(folded[0] << 21 | folded[1])
+                else:
+                    singles.add(folded[0])
+        n = self.codepoints.size
+        if not by_length or not n:
+            return np.zeros(self.size, dtype=np.intp)
+        if self._candidates is None:
+            # Offsets not preceded by a word character, i.e. where (?<!\w) holds
+            self._candidates = np.flatnonzero(np.concatenate(([True], ~self.is_word[:-1])))
+        candidates = self._candidates
+        first = self.folded[candidates].astype(np.uint64)
+        second = self.folded[np.minimum(candidates + 1, n - 1)].astype(np.uint64)
+        keep = np.isin(first << np.uint64(21) | second, np.fromiter(prefixes, dtype=np.uint64))
+        if singles:
+            keep |= np.isin(first, np.fromiter(singles, dtype=np.uint64))
+        candidates = candidates[keep]
+        window = np.zeros(candidates.size, dtype=np.uint64)
+        power = 1
+        hits = []
+        for offset in range(max(by_length)):
+            column = self.folded[np.minimum(candidates + offset, n - 1)].astype(np.uint64)
+            window += column * np.uint64(power)
+            power = (power * _HASH_BASE) % 2 ** 64
+            length = offset + 1
+            if length in by_length:
+                ends = candidates + length
+                after_ok = (ends == n) | ~self.is_word[np.minimum(ends, n - 1)]
+                matched = np.isin(window, np.fromiter(by_length[length], dtype=np.uint64)) & after_ok
+                hits.append(candidates[matched & (ends <= n)])
+        return self._per_text(np.unique(np.concatenate(hits)))
+
+    def regex_counts(self, pattern, flags=0):
+        """Per-text start offsets matched by an arbitrary regex (slow path)."""
+        compiled = re.compile(f"(?=(?:{pattern}))", flags)
+        joined = _SEPARATOR.join(self.texts)
+        positions = np.fromiter((m.start() for m in compiled.finditer(joined)), dtype=np.intp)
+        return self._per_text(positions)